@@ -0,0 +1,49 @@
+"""
+Runs the benchmark suite and compares it against the stored baseline.
+
+    PYTHONPATH=python python -m benchmarks --size quick
+    PYTHONPATH=python python -m benchmarks --size full --save
+
+Exits with 1 if any benchmark regressed by more than the tolerance. Baselines
+are machine specific, save a new baseline before comparing on other hardware.
+"""
+import argparse
+import os
+import sys
+
+from benchmarks import suite
+
+
+BASELINE = os.path.join(os.path.dirname(os.path.abspath(__file__)), 'baseline.json')
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(prog='benchmarks', description=__doc__,
+                                     formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument('--size', choices=sorted(suite.SIZES), default='quick')
+    parser.add_argument('--repeat', type=int, default=5)
+    parser.add_argument('--baseline', default=BASELINE)
+    parser.add_argument('--tolerance', type=float, default=0.25)
+    parser.add_argument('--save', action='store_true', help='Store the results as the baseline')
+    args = parser.parse_args(argv)
+
+    report = suite.run(args.size, repeat=args.repeat)
+    baseline = suite.load_baseline(args.baseline, args.size)
+    print(suite.format_report(report, baseline))
+
+    if args.save:
+        suite.save_baseline(args.baseline, report)
+        print('Saved baseline to {}'.format(args.baseline))
+        return 0
+    if baseline is None:
+        print('No baseline for size {!r}'.format(args.size))
+        return 0
+
+    regressions = suite.compare(report, baseline, args.tolerance)
+    for regression in regressions:
+        print('REGRESSION: ' + regression)
+    return 1 if regressions else 0
+
+
+if __name__ == '__main__':
+    sys.exit(main())
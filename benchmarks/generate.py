@@ -0,0 +1,109 @@
+import os
+import random
+
+from sherpa import constants
+
+
+def make_config(root='/projects', num_templates=50, depth=4, num_choices=10):
+    """
+    Builds a configuration of a root template, a chain of depth directory
+    templates below it, and num_templates leaf templates below the deepest
+    directory, each with its own literal directory, a choices token, a
+    version and a frame.
+
+    :param str  root:           Literal root directory of all templates
+    :param int  num_templates:  Number of leaf templates
+    :param int  depth:          Number of directory templates between the
+                                root and the leaf templates
+    :param int  num_choices:    Number of choices of the 'kind' token
+    :rtype: dict[str, dict]
+    """
+    tokens = {
+        'project': 'str',
+        'kind': {'type': 'str', 'choices': ['kind{:04d}'.format(i) for i in range(num_choices)]},
+        'version': {'type': 'int', 'padding': 3},
+        'frame': {'type': 'int', 'padding': 4},
+    }
+    templates = {'root': root.rstrip('/') + '/{project}'}
+    parent = 'root'
+    for level in range(1, depth + 1):
+        tokens['d{}'.format(level)] = 'str'
+        name = 'level{}'.format(level)
+        templates[name] = '{{@{}}}/{{d{}}}'.format(parent, level)
+        parent = name
+    last = 'd{}'.format(depth) if depth else 'project'
+    for i in range(num_templates):
+        templates['asset{}'.format(i)] = '{{@{}}}/area{}/{{kind}}/v{{version}}/{{{}}}.{{frame}}.exr'.format(
+            parent, i, last
+        )
+    return {constants.TOKEN_KEY: tokens, constants.TEMPLATE_KEY: templates}
+
+
+def make_fields(resolver, template_name, rng, num_values=10):
+    """
+    Random valid fields for a template
+
+    :param PathResolver     resolver:
+    :param str              template_name:
+    :param random.Random    rng:
+    :param int              num_values:     Number of distinct values to pick
+                                            from for tokens without choices
+    :rtype: dict
+    """
+    fields = {}
+    for name, token in resolver.get_template(template_name).tokens.items():
+        if token.choices:
+            fields[name] = rng.choice(token.choices)
+        elif name == 'version':
+            fields[name] = rng.randint(1, num_values)
+        elif name == 'frame':
+            fields[name] = 1001 + rng.randrange(num_values * 10)
+        else:
+            fields[name] = '{}{}'.format(name, rng.randrange(num_values))
+    return fields
+
+
+def make_paths(resolver, count, seed=0, leaves_only=True, num_values=10):
+    """
+    Formats random paths from the resolver's templates
+
+    :param PathResolver resolver:
+    :param int          count:
+    :param int          seed:
+    :param bool         leaves_only:    If True, only formats templates that
+                                        no other template references
+    :param int          num_values:     See make_fields
+    :rtype: list[str]
+    """
+    rng = random.Random(seed)
+    names = sorted(name for name in resolver.graph
+                   if not (leaves_only and resolver.graph.children(name)))
+    paths = []
+    for _ in range(count):
+        name = rng.choice(names)
+        fields = make_fields(resolver, name, rng, num_values=num_values)
+        paths.append(resolver.get_template(name).format(fields))
+    return paths
+
+
+def make_tree(resolver, count, seed=0, num_values=3):
+    """
+    Creates an empty file for each of count random paths, the resolver's
+    root must be a writable directory, eg, a temporary directory. Few values
+    are used by default so that templates share directories like a real
+    project.
+
+    :param PathResolver resolver:
+    :param int          count:
+    :param int          seed:
+    :param int          num_values: See make_fields
+    :rtype: list[str]
+    :return: Sorted unique paths that were created
+    """
+    paths = sorted(set(make_paths(resolver, count, seed=seed, num_values=num_values)))
+    for path in paths:
+        directory = os.path.dirname(path)
+        if not os.path.isdir(directory):
+            os.makedirs(directory)
+        open(path, 'w').close()
+    return paths
@@ -0,0 +1,231 @@
+import collections
+import json
+import os
+import platform
+import random
+import shutil
+import tempfile
+import time
+import tracemalloc
+
+from sherpa.resolver import PathResolver
+
+from benchmarks import generate
+
+
+# Size: parameters for the generated config, corpus and tree
+SIZES = {
+    'quick': {'num_templates': 10, 'depth': 3, 'num_choices': 5,
+              'num_paths': 2000, 'num_files': 500},
+    'full': {'num_templates': 50, 'depth': 4, 'num_choices': 200,
+             'num_paths': 20000, 'num_files': 5000},
+}
+
+# Metric: whether a higher value is better
+METRICS = {
+    'items_per_second': True,
+    'peak_kb': False,
+}
+
+Result = collections.namedtuple('Result', 'name items seconds items_per_second peak_kb')
+Result.__doc__ = """
+:param str      name:               Name of the benchmark
+:param int      items:              Number of items processed per run
+:param float    seconds:            Fastest run
+:param float    items_per_second:   Throughput of the fastest run
+:param float    peak_kb:            Peak memory allocated during a run
+"""
+
+
+def measure(name, func, repeat=5, min_time=0.5):
+    """
+    Times the fastest of at least repeat runs, running more until min_time
+    seconds have been spent so that short benchmarks aren't skewed by noise,
+    then measures the peak memory of one more run with tracemalloc, which
+    would otherwise skew the timings. The results are held until the peak is
+    measured so that it includes the memory of the results.
+
+    :param str      name:
+    :param callable func:   Function running the benchmark once and returning
+                            a list of the results for each item
+    :param int      repeat:
+    :param float    min_time:
+    :rtype: Result
+    """
+    seconds = None
+    items = 0
+    runs = 0
+    total = 0.0
+    while runs < repeat or total < min_time:
+        start = time.perf_counter()
+        items = len(func())
+        elapsed = time.perf_counter() - start
+        seconds = elapsed if seconds is None else min(seconds, elapsed)
+        runs += 1
+        total += elapsed
+
+    tracemalloc.start()
+    try:
+        results = func()
+        _, peak = tracemalloc.get_traced_memory()
+        del results
+    finally:
+        tracemalloc.stop()
+    return Result(name, items, seconds, items / seconds if seconds else 0.0, peak / 1024.0)
+
+
+def bench_parse_path(resolver, paths):
+    parse_path = resolver.parse_path
+    return [parse_path(path) for path in paths]
+
+
+def bench_extract_closest_template(resolver, paths):
+    extract = resolver.extract_closest_template
+    return [extract(path) for path in paths]
+
+
+def bench_format(formats):
+    return [template.format(fields) for template, fields in formats]
+
+
+def bench_paths(templates):
+    return [path for template in templates for path in template.paths({})]
+
+
+def bench_values_from_paths(templates):
+    return [value for template in templates
+            for value in template.values_from_paths('frame', {}).values()]
+
+
+def run(size='quick', repeat=5, params=None, min_time=0.5):
+    """
+    Generates the data for a size and runs every benchmark on it
+
+    :param str  size:   Name of the size in SIZES
+    :param int  repeat: Number of timed runs of each benchmark
+    :param dict params: Optional overrides of the size's parameters
+    :param float min_time:  Minimum seconds to time each benchmark for
+    :rtype: dict
+    :return: Report of {'size', 'params', 'python', 'results': {name: {metric: value}}}
+    """
+    params = dict(SIZES[size], **(params or {}))
+    config_params = {key: params[key] for key in ('num_templates', 'depth', 'num_choices')}
+    resolver = PathResolver(generate.make_config(**config_params))
+    paths = generate.make_paths(resolver, params['num_paths'])
+
+    # Directories of the paths with a remainder no template matches
+    extract_paths = [os.path.dirname(path) + '/scratch/notes.txt' for path in paths]
+
+    rng = random.Random(0)
+    leaves = [name for name in resolver.graph if not resolver.graph.children(name)]
+    formats = []
+    for _ in range(params['num_paths']):
+        name = rng.choice(leaves)
+        formats.append((resolver.get_template(name), generate.make_fields(resolver, name, rng)))
+
+    root = tempfile.mkdtemp(prefix='sherpa-bench-')
+    try:
+        disk_resolver = PathResolver(generate.make_config(root=root.replace(os.path.sep, '/'),
+                                                          **config_params))
+        generate.make_tree(disk_resolver, params['num_files'])
+        disk_templates = [disk_resolver.get_template(name) for name in leaves]
+
+        benchmarks = (
+            ('parse_path', lambda: bench_parse_path(resolver, paths)),
+            ('extract_closest_template',
+             lambda: bench_extract_closest_template(resolver, extract_paths)),
+            ('format', lambda: bench_format(formats)),
+            ('paths', lambda: bench_paths(disk_templates)),
+            ('values_from_paths', lambda: bench_values_from_paths(disk_templates)),
+        )
+        results = [measure(name, func, repeat, min_time) for name, func in benchmarks]
+    finally:
+        shutil.rmtree(root, ignore_errors=True)
+
+    return {
+        'size': size,
+        'params': params,
+        'python': platform.python_version(),
+        'results': {result.name: {'items_per_second': result.items_per_second,
+                                  'peak_kb': result.peak_kb}
+                    for result in results},
+    }
+
+
+def compare(report, baseline, tolerance=0.25):
+    """
+    Compares a report against a baseline report of the same size
+
+    :param dict     report:
+    :param dict     baseline:
+    :param float    tolerance:  Fraction a metric can be worse than the
+                                baseline before it's a regression
+    :rtype: list[str]
+    :return: Description of each regression
+    """
+    regressions = []
+    for name, metrics in sorted(report['results'].items()):
+        baseline_metrics = baseline['results'].get(name)
+        if baseline_metrics is None:
+            continue
+        for metric, higher_is_better in sorted(METRICS.items()):
+            value = metrics[metric]
+            expected = baseline_metrics.get(metric)
+            if not expected:
+                continue
+            change = (value - expected) / expected
+            if (-change if higher_is_better else change) > tolerance:
+                regressions.append('{} {}: {:.1f} vs baseline {:.1f} ({:+.0%})'.format(
+                    name, metric, value, expected, change
+                ))
+    return regressions
+
+
+def format_report(report, baseline=None):
+    """
+    :param dict report:
+    :param dict baseline:
+    :rtype: str
+    """
+    lines = ['{:<26}{:>16}{:>12}{:>12}'.format('benchmark', 'items/s', 'peak KB', 'vs base')]
+    for name, metrics in sorted(report['results'].items()):
+        change = ''
+        expected = baseline and baseline['results'].get(name, {}).get('items_per_second')
+        if expected:
+            change = '{:+.0%}'.format((metrics['items_per_second'] - expected) / expected)
+        lines.append('{:<26}{:>16.1f}{:>12.1f}{:>12}'.format(
+            name, metrics['items_per_second'], metrics['peak_kb'], change
+        ))
+    return '\n'.join(lines)
+
+
+def load_baseline(path, size):
+    """
+    :param str  path:
+    :param str  size:
+    :rtype: dict|None
+    :return: Baseline report for the size, or None if there isn't one
+    """
+    try:
+        with open(path) as f:
+            return json.load(f).get(size)
+    except (OSError, ValueError):
+        return None
+
+
+def save_baseline(path, report):
+    """
+    Stores the report as the baseline for its size, keeping other sizes
+
+    :param str  path:
+    :param dict report:
+    """
+    try:
+        with open(path) as f:
+            baselines = json.load(f)
+    except (OSError, ValueError):
+        baselines = {}
+    baselines[report['size']] = report
+    with open(path, 'w') as f:
+        json.dump(baselines, f, indent=2, sort_keys=True)
+        f.write('\n')
@@ -0,0 +1,124 @@
+import collections
+import os
+import threading
+import time
+
+from sherpa import constants, walker
+
+
+CacheStats = collections.namedtuple('CacheStats', 'hits misses evictions size')
+
+
+class ListingCache(walker.DirectoryLister):
+    """
+    Directory lister that caches the listing of each directory.
+
+    Cached listings are validated against the directory's modification time,
+    which changes whenever an entry is added, removed or renamed, and expire
+    after an optional time to live. The least recently used listings are
+    evicted once the maximum number of entries is reached.
+
+    The cache is safe to share between threads.
+    """
+
+    def __init__(self, ttl=None, max_entries=constants.LISTING_CACHE_SIZE, lister=None):
+        """
+        :param float                    ttl:            Seconds a listing is
+                                                        valid for, or None to
+                                                        only validate by mtime
+        :param int                      max_entries:    Maximum number of cached
+                                                        directories
+        :param walker.DirectoryLister   lister:         Lister to cache
+        """
+        if max_entries < 1:
+            raise ValueError('Invalid max_entries: {}'.format(max_entries))
+        self._ttl = ttl
+        self._max_entries = max_entries
+        self._lister = lister or walker.DEFAULT_LISTER
+
+        # Path: (mtime, time cached, entries)
+        self._entries = collections.OrderedDict()
+        self._lock = threading.Lock()
+        self._hits = 0
+        self._misses = 0
+        self._evictions = 0
+
+    def __getstate__(self):
+        # Locks can't be pickled, and cached listings are only valid locally
+        return {'ttl': self._ttl, 'max_entries': self._max_entries, 'lister': self._lister}
+
+    def __setstate__(self, state):
+        self.__init__(**state)
+
+    def __repr__(self):
+        return 'ListingCache(ttl={!r}, max_entries={!r}, lister={!r})'.format(
+            self._ttl, self._max_entries, self._lister
+        )
+
+    @property
+    def max_entries(self):
+        """
+        :rtype: int
+        """
+        return self._max_entries
+
+    @property
+    def stats(self):
+        """
+        :rtype: CacheStats
+        """
+        with self._lock:
+            return CacheStats(self._hits, self._misses, self._evictions, len(self._entries))
+
+    @property
+    def ttl(self):
+        """
+        :rtype: float
+        """
+        return self._ttl
+
+    def clear(self):
+        """ Removes all cached listings and resets the statistics """
+        with self._lock:
+            self._entries.clear()
+            self._hits = self._misses = self._evictions = 0
+
+    def exists(self, path):
+        """
+        :param str  path:
+        :rtype: bool
+        """
+        return self._lister.exists(path)
+
+    def listdir(self, path):
+        """
+        Lists the entries of a directory, see DirectoryLister.listdir
+
+        :param str  path:
+        :rtype: tuple[tuple[str, bool]]
+        """
+        try:
+            mtime = os.stat(path).st_mtime_ns
+        except OSError:
+            # Missing directories are not cached as they may be created later
+            return tuple(self._lister.listdir(path))
+
+        now = time.time()
+        with self._lock:
+            cached = self._entries.get(path)
+            if cached is not None:
+                cached_mtime, cached_time, entries = cached
+                if cached_mtime == mtime and (self._ttl is None or now - cached_time < self._ttl):
+                    self._entries.move_to_end(path)
+                    self._hits += 1
+                    return entries
+            self._misses += 1
+
+        entries = tuple(self._lister.listdir(path))
+        with self._lock:
+            self._entries[path] = (mtime, now, entries)
+            self._entries.move_to_end(path)
+            while len(self._entries) > self._max_entries:
+                self._entries.popitem(last=False)
+                self._evictions += 1
+        return entries
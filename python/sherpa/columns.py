@@ -0,0 +1,160 @@
+import array
+import collections
+
+try:
+    import numpy
+except ImportError:
+    numpy = None
+
+
+ParsedColumns = collections.namedtuple('ParsedColumns', 'columns template_ids mask templates')
+ParsedColumns.__doc__ = """
+Parsed fields of many paths stored as one column per token
+
+:param dict[str, object]    columns:        Column for each token by name, an
+                                            int or float array or a
+                                            DictionaryColumn for str tokens
+:param array                template_ids:   Index into templates of the
+                                            template each path matched, or
+                                            -1 if it didn't match
+:param array                mask:           Whether or not each path matched
+:param tuple[Template]      templates:      Templates referenced by
+                                            template_ids
+"""
+
+DictionaryColumn = collections.namedtuple('DictionaryColumn', 'codes categories')
+DictionaryColumn.__doc__ = """
+Dictionary encoded string column, eg, for pandas.Categorical.from_codes
+
+:param array        codes:      Index into categories of each row's value, or
+                                -1 if the row has no value
+:param list[str]    categories: Unique values in the order first parsed
+"""
+
+
+class _IntColumn(object):
+    __slots__ = ('values', )
+    typecode = 'q'
+    dtype = 'int64'
+    missing = 0
+
+    def __init__(self):
+        self.values = array.array(self.typecode)
+
+    def append(self, value):
+        self.values.append(value)
+
+    def extend_missing(self, count):
+        self.values.extend([self.missing] * count)
+
+    def finish(self):
+        return _to_array(self.values, self.dtype)
+
+
+class _FloatColumn(_IntColumn):
+    __slots__ = ()
+    typecode = 'd'
+    dtype = 'float64'
+    missing = float('nan')
+
+
+class _DictionaryColumn(object):
+    __slots__ = ('codes', 'lookup')
+
+    def __init__(self):
+        self.codes = array.array('i')
+        self.lookup = {}  # type: dict[str, int]
+
+    def append(self, value):
+        code = self.lookup.get(value)
+        if code is None:
+            code = self.lookup[value] = len(self.lookup)
+        self.codes.append(code)
+
+    def extend_missing(self, count):
+        self.codes.extend([-1] * count)
+
+    def finish(self):
+        # Dictionaries are ordered, the keys are the categories in code order
+        return DictionaryColumn(_to_array(self.codes, 'int32'), list(self.lookup))
+
+
+# Token type: column storing its values
+COLUMN_TYPES = {
+    float: _FloatColumn,
+    int: _IntColumn,
+    str: _DictionaryColumn,
+}
+
+
+def parse_columns(paths, match, templates):
+    """
+    Parses paths into columns, see ParsedColumns. Arrays are numpy arrays if
+    numpy is installed, otherwise array.array. Rows where a column's token
+    isn't parsed, ie, the path didn't match or matched a template without the
+    token, hold 0 for int columns, NaN for float columns and a code of -1 for
+    str columns.
+
+    Columns are ordered by the templates' ordered_fields, in the order of the
+    templates.
+
+    :param          paths:      Any iterable of path strings
+    :param callable match:      Function returning the (template id, fields)
+                                for a path, or None if it doesn't match
+    :param tuple[Template] templates:
+    :rtype: ParsedColumns
+    """
+    builders = collections.OrderedDict()
+    template_ids = array.array('i')
+    mask = array.array('b')
+    row = 0
+    for path in paths:
+        result = match(path)
+        if result is None:
+            template_ids.append(-1)
+            mask.append(0)
+            fields = {}
+        else:
+            template_id, fields = result
+            template_ids.append(template_id)
+            mask.append(1)
+            for name in fields:
+                if name not in builders:
+                    # Add columns as they're found, with no value for the
+                    # rows before
+                    token = templates[template_id].tokens[name]
+                    builder = COLUMN_TYPES.get(token.type, _DictionaryColumn)()
+                    builder.extend_missing(row)
+                    builders[name] = builder
+
+        for name, builder in builders.items():
+            value = fields.get(name)
+            if value is None:
+                builder.extend_missing(1)
+            else:
+                builder.append(value)
+        row += 1
+
+    order = {}
+    for template in templates:
+        for name in template.ordered_fields:
+            order.setdefault(name, len(order))
+    columns = collections.OrderedDict(
+        (name, builders[name].finish()) for name in sorted(builders, key=order.get)
+    )
+    return ParsedColumns(columns, _to_array(template_ids, 'int32'), _to_array(mask, 'bool'),
+                         tuple(templates))
+
+
+def _to_array(values, dtype):
+    """
+    :param array.array  values:
+    :param str          dtype:  numpy dtype for the values' typecode
+    :rtype: array.array|numpy.ndarray
+    """
+    if numpy is None:
+        return values
+    if not values:
+        return numpy.empty(0, dtype=dtype)
+    # Shares the array's buffer instead of copying
+    return numpy.frombuffer(values, dtype=dtype)
@@ -10,3 +10,25 @@ TOKEN_TYPE = 'type'
 
 WILDCARD = '*'
 WILDCARD_ONE = '?'
+
+ON_ERROR_COLLECT = 'collect'
+ON_ERROR_RAISE = 'raise'
+ON_ERROR_SKIP = 'skip'
+ON_ERROR_POLICIES = (ON_ERROR_COLLECT, ON_ERROR_RAISE, ON_ERROR_SKIP)
+
+CHUNK_SIZE = 1000
+CONCURRENCY = 8
+# Maximum number of names a segment's choices expand to before the walker
+# lists the directory instead of checking each name exists
+CHOICE_PROBE_LIMIT = 32
+# Maximum number of choices a token's regex matches exactly, tokens with more
+# choices match any value and check the choices after matching
+CHOICE_REGEX_LIMIT = 32
+# Largest absolute int value shared by an InternPool
+INTERN_INT_LIMIT = 100000
+LISTING_CACHE_SIZE = 10000
+
+SNAPSHOT_SUFFIX = '.snapshot.json'
+SNAPSHOT_VERSION = 1
+
+WATCH_INTERVAL = 1.0
@@ -0,0 +1,157 @@
+import heapq
+
+from sherpa import constants
+from sherpa.exceptions import PathResolverError
+
+
+class TemplateGraph(object):
+    """
+    Dependency graph of the templates in a configuration, built from the
+    template strings alone so that no templates need to be loaded.
+
+    A template depends on the templates it references, ie, its parent and
+    relatives. Its children are the templates referencing it directly, and its
+    descendants are every template derived from it through any number of
+    references. Descendants are precomputed so all lookups are constant time.
+
+    References to templates that are not in the configuration are ignored,
+    they are reported when the referencing template is loaded.
+    """
+
+    def __init__(self, template_config):
+        """
+        :raise PathResolverError: if the templates reference each other in a
+                                  cycle
+        :param dict[str, str]   template_config:
+        """
+        self._references = {}  # type: dict[str, frozenset[str]]
+        self._tokens = {}  # type: dict[str, frozenset[str]]
+        for name, template_string in template_config.items():
+            template_names = set()
+            token_names = set()
+            for match in constants.MATCH_PATTERN.finditer(template_string):
+                is_template, reference = match.groups()
+                (template_names if is_template else token_names).add(reference)
+            self._references[name] = frozenset(n for n in template_names if n in template_config)
+            self._tokens[name] = frozenset(token_names)
+
+        children = {name: set() for name in template_config}
+        for name, references in self._references.items():
+            for reference in references:
+                children[reference].add(name)
+        self._children = {name: frozenset(names) for name, names in children.items()}
+
+        self._order = self._sort(template_config)
+        self._positions = {name: i for i, name in enumerate(self._order)}
+
+        # Children are always after their references in the load order, so
+        # walking it backwards has every child's descendants ready
+        self._descendants = {}  # type: dict[str, frozenset[str]]
+        for name in reversed(self._order):
+            descendants = set(self._children[name])
+            for child in self._children[name]:
+                descendants.update(self._descendants[child])
+            self._descendants[name] = frozenset(descendants)
+
+    def __contains__(self, name):
+        return name in self._references
+
+    def __iter__(self):
+        return iter(self._order)
+
+    def __len__(self):
+        return len(self._order)
+
+    @property
+    def order(self):
+        """
+        Template names in an order where every template comes after the
+        templates it references. Independent templates keep their
+        configuration order.
+
+        :rtype: tuple[str]
+        """
+        return self._order
+
+    def children(self, name):
+        """
+        :param str  name:
+        :rtype: frozenset[str]
+        :return: Names of the templates directly referencing the template
+        """
+        return self._children[name]
+
+    def descendants(self, name):
+        """
+        :param str  name:
+        :rtype: frozenset[str]
+        :return: Names of all templates derived from the template
+        """
+        return self._descendants[name]
+
+    def index(self, name):
+        """
+        :param str  name:
+        :rtype: int
+        :return: Position of the template in the load order, see order
+        """
+        return self._positions[name]
+
+    def references(self, name):
+        """
+        :param str  name:
+        :rtype: frozenset[str]
+        :return: Names of the templates the template directly references
+        """
+        return self._references[name]
+
+    def tokens(self, name):
+        """
+        :param str  name:
+        :rtype: frozenset[str]
+        :return: Names of the tokens the template directly uses
+        """
+        return self._tokens[name]
+
+    def _find_cycle(self, names):
+        """
+        :param set[str] names:  Names that could not be ordered
+        :rtype: list[str]
+        """
+        # Every unordered template references at least one other unordered
+        # template, following them must eventually revisit a template
+        name = min(names)
+        path = []
+        visited = {}
+        while name not in visited:
+            visited[name] = len(path)
+            path.append(name)
+            name = min(self._references[name].intersection(names))
+        return path[visited[name]:] + [name]
+
+    def _sort(self, template_config):
+        """
+        :raise PathResolverError: if the templates reference each other in a
+                                  cycle
+        :param dict[str, str]   template_config:
+        :rtype: tuple[str]
+        """
+        declared = {name: i for i, name in enumerate(template_config)}
+        remaining = {name: len(references) for name, references in self._references.items()}
+        ready = [(declared[name], name) for name, count in remaining.items() if count == 0]
+        heapq.heapify(ready)
+        order = []
+        while ready:
+            _, name = heapq.heappop(ready)
+            order.append(name)
+            for child in self._children[name]:
+                remaining[child] -= 1
+                if remaining[child] == 0:
+                    heapq.heappush(ready, (declared[child], child))
+
+        if len(order) != len(declared):
+            cycle = self._find_cycle(set(declared).difference(order))
+            raise PathResolverError('Templates reference each other in a cycle: {}'.format(
+                ' -> '.join(cycle)
+            ))
+        return tuple(order)
@@ -0,0 +1,168 @@
+import os
+import re
+
+from sherpa import constants
+
+
+# Characters that make a literal segment behave as a regex when embedded in a
+# Template's regex. Segments containing any of these are matched by regex.
+REGEX_CHARACTERS = frozenset('.^$*+?{}[]\\|()')
+
+
+class _Node(object):
+    """ Single path component level in the index """
+    __slots__ = ('literals', 'patterns', 'templates')
+
+    def __init__(self):
+        self.literals = {}      # type: dict[str, _Node]
+        self.patterns = {}      # type: dict[str, tuple[re.Pattern, _Node]]
+        self.templates = []     # type: list[tuple[tuple, Template]]
+
+
+class TemplateIndex(object):
+    """
+    Dispatch index over a set of templates, keyed on the directory components
+    of each template's pattern.
+
+    Literal components are looked up directly, components containing tokens
+    are matched using the tokens' regex. A path is split into its components
+    once and walked through the index to narrow the templates down to those
+    whose every component matches. Candidates still need to be validated by
+    the template itself as the index does not validate token values.
+
+    Candidates are ranked by:
+        1. Specificity: the number of literal (non-token) characters in the
+           template's pattern, more literal characters wins. This ensures
+           '{@entity}/publishes' is preferred over '{@entity}/{task}'.
+        2. Declaration order: the order the templates were given in.
+    """
+
+    def __init__(self, templates):
+        """
+        :param list[Template]   templates:  Templates in declaration order
+        """
+        self._root = _Node()
+        for order, template in enumerate(templates):
+            self._insert(template, order)
+
+    @staticmethod
+    def priority(template, order):
+        """
+        Sort key used to rank templates matching the same path
+
+        :param Template template:
+        :param int      order:      Declaration order of the template
+        :rtype: tuple[int, int]
+        """
+        specificity = len(constants.MATCH_PATTERN.sub('', template.pattern))
+        return -specificity, order
+
+    @staticmethod
+    def split(path):
+        """
+        :param str  path:
+        :rtype: list[str]
+        """
+        return path.replace(os.path.sep, '/').split('/')
+
+    def candidates(self, path):
+        """
+        Templates whose components all match the path, in priority order
+
+        :param str  path:
+        :rtype: list[Template]
+        """
+        components = self.split(path)
+        num_components = len(components)
+        matches = []
+        stack = [(self._root, 0)]
+        while stack:
+            node, depth = stack.pop()
+            if depth == num_components:
+                matches.extend(node.templates)
+                continue
+
+            component = components[depth]
+            child = node.literals.get(component)
+            if child is not None:
+                stack.append((child, depth + 1))
+            for regex, child in node.patterns.values():
+                if regex.match(component) is not None:
+                    stack.append((child, depth + 1))
+
+        matches.sort(key=lambda item: item[0])
+        return [template for _, template in matches]
+
+    def prefix_candidates(self, path, directory=True):
+        """
+        Templates whose components match the start of the path, walking the
+        path's components once. Candidates are ordered by the number of
+        components they match, deepest first, followed by priority.
+
+        :param str  path:
+        :param bool directory:  If False, templates whose last component only
+                                matches the start of a path component are also
+                                included, see Template.extract
+        :rtype: list[Template]
+        """
+        components = self.split(path)
+        num_components = len(components)
+        matches = []
+        stack = [(self._root, 0)]
+        while stack:
+            node, depth = stack.pop()
+            matches.extend((-depth, key, template) for key, template in node.templates)
+            if depth == num_components:
+                continue
+
+            component = components[depth]
+            # Patterns with a trailing separator end in an empty component
+            # which matches the start of any remaining path
+            trailing = node.literals.get('')
+            if trailing is not None and component:
+                matches.extend((-depth - 1, key, template) for key, template in trailing.templates)
+
+            child = node.literals.get(component)
+            if child is not None:
+                stack.append((child, depth + 1))
+            for regex, child in node.patterns.values():
+                if regex.match(component) is not None:
+                    stack.append((child, depth + 1))
+
+            if not directory:
+                # The last component may end partway through a path component,
+                # token values are validated by the template
+                for literal, child in node.literals.items():
+                    if literal != component and component.startswith(literal):
+                        matches.extend((-depth - 1, key, template)
+                                       for key, template in child.templates)
+                for regex, child in node.patterns.values():
+                    matches.extend((-depth - 1, key, template) for key, template in child.templates)
+
+        matches.sort(key=lambda item: item[:2])
+        # A template may be reached more than once when not matching directories
+        seen = set()
+        return [template for _, _, template in matches
+                if not (template in seen or seen.add(template))]
+
+    def _insert(self, template, order):
+        """
+        :param Template template:
+        :param int      order:
+        """
+        tokens = template.tokens
+        regex_tokens = {name: '({})'.format(token.regex) for name, token in tokens.items()}
+
+        node = self._root
+        for segment in self.split(template.pattern):
+            if '{' not in segment and not REGEX_CHARACTERS.intersection(segment):
+                node = node.literals.setdefault(segment, _Node())
+                continue
+
+            regex = segment.format(**regex_tokens)
+            entry = node.patterns.get(regex)
+            if entry is None:
+                entry = node.patterns[regex] = (re.compile(regex + '$'), _Node())
+            node = entry[1]
+
+        node.templates.append((self.priority(template, order), template))
@@ -0,0 +1,60 @@
+from sherpa import constants
+
+
+class InternPool(object):
+    """
+    Shares equal parsed values between parse results so that fields repeated
+    across many paths, eg, the project and task of every frame in a
+    directory, are only stored once.
+
+    Strings are always shared. Ints are shared if their absolute value is
+    within int_limit, larger values such as unique ids are rarely repeated
+    and would only grow the pool. Other types are returned unchanged.
+
+    Unlike sys.intern the pool is scoped, values are released once the pool
+    and all results using them are released. The pool is safe to share
+    between threads.
+    """
+
+    def __init__(self, int_limit=constants.INTERN_INT_LIMIT):
+        """
+        :param int  int_limit:  Largest absolute int value to share
+        """
+        self._int_limit = int_limit
+        self._values = {}
+
+    def __contains__(self, value):
+        return value in self._values
+
+    def __len__(self):
+        return len(self._values)
+
+    def __repr__(self):
+        return 'InternPool(int_limit={!r})'.format(self._int_limit)
+
+    @property
+    def int_limit(self):
+        """
+        :rtype: int
+        """
+        return self._int_limit
+
+    def clear(self):
+        """ Removes all shared values """
+        self._values.clear()
+
+    def intern(self, value):
+        """
+        :param value:
+        :return: The pool's copy of an equal value, or the value itself if
+                 it's the first of its value or not a shared type
+        """
+        value_type = type(value)
+        if value_type is int:
+            if not -self._int_limit <= value <= self._int_limit:
+                return value
+        elif value_type is not str:
+            return value
+        # Only ints and strs are stored and never equal each other.
+        # setdefault is atomic so concurrent callers get the same value.
+        return self._values.setdefault(value, value)
@@ -0,0 +1,112 @@
+import json
+import os
+
+import yaml
+
+try:
+    # libyaml bindings are much faster when available
+    from yaml import CSafeLoader as YamlLoader
+except ImportError:
+    from yaml import SafeLoader as YamlLoader
+
+try:
+    import msgpack
+except ImportError:
+    msgpack = None
+
+from sherpa import constants
+from sherpa.exceptions import PathResolverError
+
+
+def load_json(data):
+    """
+    :param bytes    data:
+    :rtype: dict
+    """
+    return json.loads(data.decode('utf-8'))
+
+
+def load_msgpack(data):
+    """
+    :raise PathResolverError: if msgpack is not installed
+    :param bytes    data:
+    :rtype: dict
+    """
+    if msgpack is None:
+        raise PathResolverError('msgpack must be installed to load msgpack configurations')
+    return msgpack.unpackb(data, raw=False)
+
+
+def load_yaml(data):
+    """
+    :param bytes    data:
+    :rtype: dict
+    """
+    return yaml.load(data, Loader=YamlLoader)
+
+
+# File extension: function converting the file's bytes to a config dictionary
+LOADERS = {
+    '.json': load_json,
+    '.mpk': load_msgpack,
+    '.msgpack': load_msgpack,
+    '.yaml': load_yaml,
+    '.yml': load_yaml,
+}
+
+
+def get_loader(filepath):
+    """
+    Loader for a configuration file based on its extension. Unknown extensions
+    are loaded as yaml.
+
+    :param str  filepath:
+    :rtype: callable
+    """
+    extension = os.path.splitext(filepath)[1].lower()
+    return LOADERS.get(extension, load_yaml)
+
+
+def load(filepath, data=None):
+    """
+    Loads a configuration file using the loader for its extension
+
+    :param str      filepath:
+    :param bytes    data:       Contents of the file if already read
+    :rtype: dict[str, dict]
+    """
+    if data is None:
+        with open(filepath, 'rb') as f:
+            data = f.read()
+    return get_loader(filepath)(data)
+
+
+def merge(configs):
+    """
+    Merges configurations in order, eg, to layer show overrides over a studio
+    configuration. Tokens and templates are merged by name with later
+    configurations replacing the full definition of an existing token or
+    template. Existing names keep their original declaration order.
+
+    :param configs: Any iterable of configuration dictionaries
+    :rtype: dict[str, dict]
+    """
+    merged = {constants.TOKEN_KEY: {}, constants.TEMPLATE_KEY: {}}
+    for config in configs:
+        for key, value in config.items():
+            if key in (constants.TOKEN_KEY, constants.TEMPLATE_KEY):
+                merged[key].update(value or {})
+            else:
+                merged[key] = value
+    return merged
+
+
+def register_loader(extension, loader):
+    """
+    Registers a loader for configuration files with the given extension
+
+    :param str      extension:  File extension including the leading '.'
+    :param callable loader:     Function converting the file's bytes to a
+                                configuration dictionary
+    """
+    LOADERS[extension.lower()] = loader
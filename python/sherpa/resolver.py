@@ -1,17 +1,25 @@
+import collections
+import copy
+import functools
+import itertools
 import os
-import yaml
+import types
+from concurrent import futures
 
-from sherpa import constants
+from sherpa import cache, columns, constants, interning, loaders, snapshot, watcher
 from sherpa.exceptions import ParseError, PathResolverError
+from sherpa.graph import TemplateGraph
+from sherpa.index import TemplateIndex
 from sherpa.template import Template
 from sherpa.token import Token
 
 
 class PathResolver(object):
     @classmethod
-    def from_environment(cls):
+    def from_environment(cls, **kwargs):
         """
-        Reads the environment variable for a file to load the configuration from
+        Reads the environment variable for a file to load the configuration
+        from. Keyword arguments are passed to from_file.
 
         :raise PathResolverError: if the environment variable is not set or
                                   set to a non-existent file
@@ -23,73 +31,270 @@ class PathResolver(object):
                 'Invalid environment path for pathresolver configuration: '
                 '{}={}'.format(constants.ENV_VAR, path)
             )
-        return cls.from_file(path)
+        return cls.from_file(path, **kwargs)
 
     @classmethod
-    def from_file(cls, filepath):
+    def from_dict(cls, *configs, **kwargs):
         """
+        Merges configurations in order, eg, to layer show overrides over a
+        studio configuration, see loaders.merge. Keyword arguments are passed
+        to the PathResolver.
+
+        :param dict[str, dict]  configs:
+        :rtype: PathResolver
+        """
+        return cls(loaders.merge(configs), **kwargs)
+
+    @classmethod
+    def from_file(cls, filepath, use_snapshot=False, snapshot_dir=None, **kwargs):
+        """
+        Loads the configuration from a file using the loader for its
+        extension, see loaders.LOADERS. Remaining keyword arguments are passed
+        to the PathResolver.
+
+        If using a snapshot, the fully resolved state is stored in a file
+        keyed by the hash of the configuration file, either next to the
+        configuration file or in snapshot_dir. A valid snapshot is loaded
+        instead of parsing and resolving the configuration, and a missing or
+        stale snapshot is rebuilt.
+
         :param str  filepath:
+        :param bool use_snapshot:   Whether or not to use a snapshot
+        :param str  snapshot_dir:   Directory to store snapshots in
         :rtype: PathResolver
         """
-        with open(filepath) as f:
-            config = yaml.load(f)
-        return cls(config)
+        with open(filepath, 'rb') as f:
+            data = f.read()
+
+        if not use_snapshot:
+            resolver = cls(loaders.load(filepath, data), **kwargs)
+        else:
+            path = snapshot.snapshot_path(filepath, snapshot_dir)
+            config_digest = snapshot.digest(data)
+            state = snapshot.load(path, config_digest)
+            if state is not None:
+                resolver = cls(state['config'], **kwargs)
+                resolver._restore_template_states(state['templates'])
+            else:
+                resolver = cls(loaders.load(filepath, data), **kwargs)
+                snapshot.dump(path, config_digest, resolver.config, resolver.templates)
+
+        resolver._sources = (filepath, )
+        return resolver
 
-    def __init__(self, config):
+    @classmethod
+    def from_files(cls, filepaths, **kwargs):
         """
-        :param dict[str, dict]  config:
+        Loads and merges configuration files in order, see from_dict and
+        from_file. Keyword arguments are passed to the PathResolver.
+
+        :param list[str]    filepaths:
+        :rtype: PathResolver
         """
-        self._template_config = config[constants.TEMPLATE_KEY]
-        self._token_config = config[constants.TOKEN_KEY]
+        resolver = cls.from_dict(*(loaders.load(path) for path in filepaths), **kwargs)
+        resolver._sources = tuple(filepaths)
+        return resolver
 
-        self._templates = {}
-        self._tokens = {}
+    def __init__(self, config, listing_cache=None, lazy=False, memoize=None,
+                 intern_values=False):
+        """
+        :param dict[str, dict]      config:
+        :param cache.ListingCache   listing_cache:  Optional cache shared by all
+                                                    templates when searching
+                                                    the disk
+        :param bool                 lazy:           If True, tokens and
+                                                    templates are only loaded
+                                                    and validated when first
+                                                    used, see validate_all
+        :param int                  memoize:        Maximum number of parsed
+                                                    paths to cache, see
+                                                    parse_cache_stats. Parsed
+                                                    fields are returned as
+                                                    read-only mappings when
+                                                    memoizing.
+        :param bool                 intern_values:  If True, equal parsed
+                                                    values are shared between
+                                                    all parse results, see
+                                                    interning.InternPool
+        """
+        if memoize is not None and memoize < 1:
+            raise ValueError('Invalid memoize size: {}'.format(memoize))
+        self._listing_cache = listing_cache
+        self._lazy = lazy
+        self._memoize = memoize
+        self._intern_pool = interning.InternPool() if intern_values else None
+        self._frozen = False
+        # Configuration files the resolver was loaded from, used for reloading
+        self._sources = ()
+        # Configuration and everything loaded from it, replaced as a whole
+        # when reloading
+        self._state = _ResolverState(config)
+        # Function matching a path to (template, fields), cached if memoizing
+        self._match = self._get_matcher()
 
-        # Ensure tokens are loaded and valid before loading templates
-        for name in self._token_config:
-            self._load_token(name)
+        if not lazy:
+            self.validate_all()
 
-        for name in self._template_config:
-            # Templates can reference other templates which recursively load,
-            # avoid reloading already evaluated templates
-            if name not in self._templates:
-                self._load_template(name)
+    def __reduce__(self):
+        # Rebuild from the config instead of pickling the loaded objects, this
+        # keeps the pickle small and avoids carrying any compiled state
+        kwargs = {'listing_cache': self._listing_cache, 'lazy': self._lazy,
+                  'memoize': self._memoize, 'intern_values': self._intern_pool is not None}
+        return _rebuild, (self.__class__, self.config, kwargs, self._frozen)
+
+    @property
+    def config(self):
+        """
+        Copy of the configuration the resolver was built from
+
+        :rtype: dict[str, dict]
+        """
+        return copy.deepcopy(self._state.config)
+
+    @property
+    def frozen(self):
+        """
+        :rtype: bool
+        """
+        return self._frozen
+
+    @property
+    def graph(self):
+        """
+        Dependency graph of the templates, see TemplateGraph
+
+        :raise PathResolverError: if the templates reference each other in a
+                                  cycle
+        :rtype: TemplateGraph
+        """
+        return self._get_graph()
+
+    @property
+    def intern_pool(self):
+        """
+        Pool sharing equal values between all parse results, if interning
+
+        :rtype: interning.InternPool|None
+        """
+        return self._intern_pool
+
+    @property
+    def lazy(self):
+        """
+        :rtype: bool
+        """
+        return self._lazy
+
+    @property
+    def listing_cache(self):
+        """
+        :rtype: cache.ListingCache
+        """
+        return self._listing_cache
+
+    @property
+    def memoize(self):
+        """
+        :rtype: int
+        """
+        return self._memoize
+
+    @property
+    def parse_cache_stats(self):
+        """
+        Statistics for the memoized parse_path results
+
+        :rtype: cache.CacheStats|None
+        :return: Statistics or None if the resolver is not memoizing
+        """
+        if self._memoize is None:
+            return None
+        info = self._match.cache_info()
+        # Every miss adds an entry, any that are no longer cached were evicted
+        return cache.CacheStats(info.hits, info.misses, info.misses - info.currsize, info.currsize)
+
+    @property
+    def sources(self):
+        """
+        Configuration files the resolver was loaded from, if any
+
+        :rtype: tuple[str]
+        """
+        return self._sources
 
     @property
     def templates(self):
         """
+        All templates, loading any that have not been loaded yet
+
         :rtype: dict[str, Template]
         """
-        return self._templates.copy()
+        self._load_templates()
+        return self._state.templates.copy()
 
     @property
     def tokens(self):
         """
+        All tokens, loading any that have not been loaded yet
+
         :rtype: dict[str, Token]
         """
-        return self._tokens.copy()
+        self._load_tokens()
+        return self._state.tokens.copy()
 
     def fields_from_path(self, path):
         """
         Convenience method that calls parse_path and discards the template
 
         :param str  path:
-        :rtype: dict
+        :rtype: dict|types.MappingProxyType
         """
         template, fields = self.parse_path(path)
         return fields
 
-    def extract_closest_template(self, path, directory=True):
+    def child_templates(self, template_name):
+        """
+        Templates directly referencing the template, in load order
+
+        :param str  template_name:
+        :rtype: list[Template]
+        """
+        return self._graph_templates(self._get_graph().children(template_name))
+
+    def clear_parse_cache(self):
+        """ Removes all memoized parse_path results and resets the statistics """
+        if self._memoize is not None:
+            self._match.cache_clear()
+
+    def descendant_templates(self, template_name):
+        """
+        All templates derived from the template through any number of
+        references, in load order
+
+        :param str  template_name:
+        :rtype: list[Template]
+        """
+        return self._graph_templates(self._get_graph().descendants(template_name))
+
+    def extract_closest_template(self, path, directory=True, ranked=False):
         """
         Finds the template that extracts the greatest number of directories in 
-        the path.
-        
+        the path. Templates extracting the same number of directories are
+        ranked by the length of the extracted path, followed by the priority
+        used by parse_path.
+
+        Candidates are found by walking the path's components through the
+        template index once, see TemplateIndex.prefix_candidates.
+
+        :raise ParseError: if no template matches the start of the path
         :param str  path: 
         :param bool directory:  If True, partial matches are only considered if 
                                 they match a full directory and not a partial 
                                 folder/filename match. The returned relative 
                                 path will strip any leading path separator.
-        :rtype: tuple[Template, str, dict, str]
+        :param bool ranked:     If True, returns all matching templates ranked
+                                from the closest to the furthest match
+        :rtype: tuple[Template, str, dict, str]|list[tuple[Template, str, dict, str]]
         :return: Tuple of (
             Template,
             matched section of path,
@@ -97,21 +302,52 @@ class PathResolver(object):
             relative remainder of path
         )
         """
-        matches = {}
-        for template in self._templates.values():
+        matches = []
+        for template in self._get_index().prefix_candidates(path, directory=directory):
             try:
                 match_path, fields, relative = template.extract(path, directory=directory)
-                matches[relative.count('/')] = (template, match_path, fields, relative)
             except ParseError:
+                # The index does not validate token values, eg, choices
                 continue
-        return matches[min(matches)]
+            matches.append((template, match_path, fields, relative))
+        if not matches:
+            raise ParseError('No templates match the start of the path: {!r}'.format(path))
+
+        # Candidates are already in priority order, the sort is stable
+        matches.sort(key=lambda match: (match[3].count('/'), len(match[3])))
+        return matches if ranked else matches[0]
+
+    def freeze(self):
+        """
+        Loads and resolves every token and template and builds all lookup
+        indexes so that the resolver is never modified again. A frozen
+        resolver can be shared between threads, all read methods such as
+        parse_path, get_template and Template.format are lock free and safe
+        to call concurrently. A frozen resolver can not be reloaded.
+
+        Unfrozen resolvers fill their caches on first use and should not be
+        shared between threads until frozen.
+
+        :rtype: PathResolver
+        :return: The resolver, for chaining
+        """
+        if self._frozen:
+            return self
+        self.validate_all()
+        for template in self._state.templates.values():
+            template.resolve()
+        for token in self._state.tokens.values():
+            token.compiled_regex
+        self._get_index()
+        self._frozen = True
+        return self
 
     def get_template(self, template_name):
         """
         :param str  template_name:
         :rtype: Template
         """
-        template = self._templates.get(template_name)
+        template = self._state.templates.get(template_name)
         # Templates can be recursive, load on demand
         if template is None:
             template = self._load_template(template_name)
@@ -122,21 +358,124 @@ class PathResolver(object):
         :param str  token_name:
         :rtype: Token
         """
-        return self._tokens[token_name]
+        token = self._state.tokens.get(token_name)
+        # Tokens are loaded on demand in lazy mode
+        if token is None:
+            token = self._load_token(token_name)
+        return token
+
+    def parse_columns(self, paths):
+        """
+        Parses many paths into one column per token instead of a dictionary
+        per path, see parse_path and columns.parse_columns. Template ids index
+        all templates in the order they are declared in the config.
+
+        :param paths: Any iterable of path strings
+        :rtype: columns.ParsedColumns
+        """
+        self._load_templates()
+        state = self._state
+        templates = tuple(state.templates[name] for name in state.template_config)
+        template_ids = {template: i for i, template in enumerate(templates)}
+        match_path = self._match
+
+        def match(path):
+            result = match_path(path)
+            if result is None:
+                return None
+            return template_ids[result[0]], result[1]
+
+        return columns.parse_columns(paths, match, templates)
 
     def parse_path(self, path):
         """
+        Finds the template matching the path. If multiple templates match, the
+        template with the most literal (non-token) characters in its pattern
+        wins, followed by the order the templates are declared in the config.
+
+        If memoizing, results are cached and the fields are a read-only
+        mapping shared by every call for the same path.
+
         :param str  path:
-        :rtype: tuple[Template, dict]
+        :rtype: tuple[Template, dict|types.MappingProxyType]
         :return: Tuple of (matching template object, dictionary of parsed fields)
         """
-        for template in self._templates.values():
-            try:
-                fields = template.parse(path)
-                return template, fields
-            except ParseError:
-                continue
-        raise ParseError('No templates match the given path: {!r}'.format(path))
+        match = self._match(path)
+        if match is None:
+            raise ParseError('No templates match the given path: {!r}'.format(path))
+        return match
+
+    def parse_paths(self, paths, chunk_size=constants.CHUNK_SIZE,
+                    on_error=constants.ON_ERROR_SKIP, pool=None):
+        """
+        Lazily parses each path in an iterable, see parse_path. Paths are read
+        from the iterable in chunks so that arbitrarily large inputs can be
+        streamed.
+
+        :raise ValueError: if on_error is not a valid policy
+        :param          paths:      Any iterable of path strings
+        :param int      chunk_size: Number of paths to read from the iterable
+                                    at a time
+        :param str      on_error:   Policy for paths that don't match any
+                                    template:
+                                    skip: unmatched paths are not yielded
+                                    raise: raises a ParseError for the first
+                                           unmatched path
+                                    collect: unmatched paths are yielded as
+                                             (path, None, None)
+        :param interning.InternPool pool:   Optional pool to share equal
+                                            values between the results of this
+                                            call, eg, a new InternPool for each
+                                            batch. Defaults to the resolver's
+                                            pool if interning.
+        :rtype: collections.Iterator[tuple[str, Template, dict]]
+        :return: Iterator of (path, matching template object, parsed fields)
+        """
+        if on_error not in constants.ON_ERROR_POLICIES:
+            raise ValueError('Invalid on_error policy {!r}, must be one of {}'.format(
+                on_error, constants.ON_ERROR_POLICIES
+            ))
+        if chunk_size < 1:
+            raise ValueError('Invalid chunk_size: {}'.format(chunk_size))
+        return self._iter_parse_paths(iter(paths), chunk_size, on_error, pool)
+
+    def parse_paths_parallel(self, paths, workers=None, chunk_size=constants.CHUNK_SIZE,
+                             on_error=constants.ON_ERROR_SKIP, ordered=True, pool=None):
+        """
+        Lazily parses each path in an iterable using a pool of processes, see
+        parse_paths. Each worker process rebuilds the resolver from its config
+        and parses whole chunks of paths at a time. Only a bounded number of
+        chunks are in flight at once so that arbitrarily large inputs can be
+        streamed.
+
+        :raise ValueError: if on_error is not a valid policy
+        :param          paths:      Any iterable of path strings
+        :param int      workers:    Number of processes, defaults to the
+                                    number of CPUs
+        :param int      chunk_size: Number of paths sent to a worker at a time
+        :param str      on_error:   Policy for paths that don't match any
+                                    template, see parse_paths
+        :param bool     ordered:    If True, results are yielded in input
+                                    order, otherwise chunks are yielded as
+                                    soon as they complete
+        :param interning.InternPool pool:   Optional pool to share equal
+                                            values between the results, see
+                                            parse_paths
+        :rtype: collections.Iterator[tuple[str, Template, dict]]
+        :return: Iterator of (path, matching template object, parsed fields)
+        """
+        if on_error not in constants.ON_ERROR_POLICIES:
+            raise ValueError('Invalid on_error policy {!r}, must be one of {}'.format(
+                on_error, constants.ON_ERROR_POLICIES
+            ))
+        if chunk_size < 1:
+            raise ValueError('Invalid chunk_size: {}'.format(chunk_size))
+        workers = workers or os.cpu_count() or 1
+        if pool is None:
+            pool = self._intern_pool
+        return self._iter_parse_paths_parallel(
+            iter(paths), workers, chunk_size, on_error, ordered, pool
+        )
 
     def paths_from_template(self, template_name, fields):
         """
@@ -144,9 +483,78 @@ class PathResolver(object):
         :param dict fields:
         :rtype: list[str]
         """
-        template = self._templates[template_name]
+        template = self.get_template(template_name)
         return template.paths(fields)
 
+    def reload(self, config=None):
+        """
+        Updates the resolver to a new configuration, rebuilding only the
+        tokens and templates that changed and the templates that reference
+        them. Unchanged templates are kept along with their resolved and
+        compiled state.
+
+        The new state is built before replacing the current state, if the new
+        configuration is invalid the resolver is left unchanged.
+
+        :raise PathResolverError: if the resolver is frozen, or if no config
+                                  is given and the resolver was not loaded
+                                  from files
+        :param dict[str, dict]  config: New configuration, defaults to
+                                        reloading the source files
+        :rtype: set[str]
+        :return: Names of the templates that were removed or rebuilt
+        """
+        if self._frozen:
+            raise PathResolverError('Frozen resolvers can not be reloaded')
+        if config is None:
+            if not self._sources:
+                raise PathResolverError('Resolver has no configuration files to reload')
+            configs = [loaders.load(path) for path in self._sources]
+            config = configs[0] if len(configs) == 1 else loaders.merge(configs)
+
+        current = self._state
+        template_config = config[constants.TEMPLATE_KEY]
+        changed_tokens = _changed_keys(current.token_config, config[constants.TOKEN_KEY])
+        changed_templates = _changed_keys(current.template_config, template_config)
+
+        # Any template using a changed token or template must be rebuilt, as
+        # must any template derived from a rebuilt template
+        graph = current.graph
+        if changed_templates or graph is None:
+            graph = TemplateGraph(template_config)
+        changed_templates.update(name for name in graph
+                                 if changed_tokens.intersection(graph.tokens(name)))
+        dirty = set(changed_templates)
+        for name in changed_templates:
+            if name in graph:
+                dirty.update(graph.descendants(name))
+
+        state = _ResolverState(
+            config,
+            tokens={name: token for name, token in current.tokens.items()
+                    if name not in changed_tokens},
+            templates={name: template for name, template in current.templates.items()
+                       if name not in dirty},
+            template_states={name: template_state
+                             for name, template_state in current.template_states.items()
+                             if name not in dirty},
+            graph=graph,
+        )
+        if not self._lazy:
+            # Load the new state on a bare resolver sharing this resolver's
+            # settings so that the current state is only replaced if it's valid
+            staged = object.__new__(type(self))
+            staged.__dict__.update(self.__dict__)
+            staged._state = state
+            staged.validate_all()
+
+        # Readers hold the state they started with, replacing it in one
+        # assignment never exposes a partially reloaded state
+        self._state = state
+        # Cached results may reference removed or rebuilt templates
+        self.clear_parse_cache()
+        return dirty
+
     def template_from_path(self, path):
         """
         Convenience method that calls parse_path and discards the fields
@@ -157,12 +565,179 @@ class PathResolver(object):
         template, fields = self.parse_path(path)
         return template
 
+    def validate_all(self):
+        """
+        Loads all tokens and templates, raising any configuration errors that
+        would be raised when loading eagerly. Intended for validating
+        configurations used in lazy mode, eg, in CI.
+        """
+        # Ensure tokens are loaded and valid before loading templates
+        self._load_tokens()
+        self._load_templates()
+
+    def watch(self, interval=constants.WATCH_INTERVAL):
+        """
+        Starts a background thread polling the source configuration files
+        for changes and reloading the resolver when they change, see reload.
+
+        :raise PathResolverError: if the resolver is frozen
+        :param float    interval:   Seconds between polls
+        :rtype: watcher.ConfigWatcher
+        :return: Started watcher, call stop() to stop watching
+        """
+        if self._frozen:
+            raise PathResolverError('Frozen resolvers can not be reloaded')
+        config_watcher = watcher.ConfigWatcher(self, interval=interval)
+        config_watcher.start()
+        return config_watcher
+
+    def _get_graph(self):
+        """
+        Lazy loads the dependency graph of the templates
+
+        :raise PathResolverError: if the templates reference each other in a
+                                  cycle
+        :rtype: TemplateGraph
+        """
+        state = self._state
+        if state.graph is None:
+            state.graph = TemplateGraph(state.template_config)
+        return state.graph
+
+    def _get_index(self):
+        """
+        Lazy loads the dispatch index over all loaded templates
+
+        :rtype: TemplateIndex
+        """
+        state = self._state
+        if state.index is None:
+            self._load_templates()
+            # Index in config declaration order so that ties are deterministic
+            order = {name: i for i, name in enumerate(state.template_config)}
+            templates = sorted(state.templates.values(),
+                               key=lambda t: order.get(t.name, len(order)))
+            state.index = TemplateIndex(templates)
+        return state.index
+
+    def _get_matcher(self):
+        """
+        :rtype: callable
+        :return: Function returning the (template, fields) matching a path or
+                 None, see _match_path
+        """
+        match_path = self._match_path
+        if self._intern_pool is not None:
+            match_path = functools.partial(match_path, pool=self._intern_pool)
+        if self._memoize is None:
+            return match_path
+
+        # lru_cache is implemented in C and is safe to share between threads
+        @functools.lru_cache(maxsize=self._memoize)
+        def match(path):
+            result = match_path(path)
+            if result is None:
+                return None
+            # Cached fields are shared between callers so must not be mutable
+            return result[0], types.MappingProxyType(result[1])
+
+        return match
+
+    def _graph_templates(self, template_names):
+        """
+        :param frozenset[str]   template_names:
+        :rtype: list[Template]
+        :return: Templates for the names in load order
+        """
+        graph = self._get_graph()
+        return [self.get_template(name) for name in sorted(template_names, key=graph.index)]
+
+    def _iter_parse_paths(self, paths, chunk_size, on_error, pool):
+        """
+        :param collections.Iterator[str]    paths:
+        :param int                          chunk_size:
+        :param str                          on_error:
+        :param interning.InternPool         pool:
+        :rtype: collections.Iterator[tuple[str, Template, dict]]
+        """
+        for chunk in _chunks(paths, chunk_size):
+            if pool is None:
+                match_path = self._match
+            else:
+                match_path = functools.partial(self._match_path, pool=pool)
+            for path in chunk:
+                match = match_path(path)
+                if match is not None:
+                    yield path, match[0], match[1]
+                elif on_error == constants.ON_ERROR_COLLECT:
+                    yield path, None, None
+                elif on_error == constants.ON_ERROR_RAISE:
+                    raise ParseError('No templates match the given path: {!r}'.format(path))
+
+    def _iter_parse_paths_parallel(self, paths, workers, chunk_size, on_error, ordered, pool):
+        """
+        :param collections.Iterator[str]    paths:
+        :param int                          workers:
+        :param int                          chunk_size:
+        :param str                          on_error:
+        :param bool                         ordered:
+        :param interning.InternPool         pool:
+        :rtype: collections.Iterator[tuple[str, Template, dict]]
+        """
+        def results(future):
+            # Workers only return template names, map them back to this
+            # resolver's templates
+            for path, template_name, fields in future.result():
+                if template_name is not None:
+                    if pool is not None:
+                        # Unpickled values are copies, share them locally
+                        fields = {field: pool.intern(value) for field, value in fields.items()}
+                    yield path, self.get_template(template_name), fields
+                elif on_error == constants.ON_ERROR_COLLECT:
+                    yield path, None, None
+                elif on_error == constants.ON_ERROR_RAISE:
+                    raise ParseError('No templates match the given path: {!r}'.format(path))
+
+        # Keep enough chunks queued that workers never wait on the consumer
+        max_pending = workers * 2
+        with futures.ProcessPoolExecutor(max_workers=workers,
+                                         initializer=_init_worker,
+                                         initargs=(self.config, )) as executor:
+            if ordered:
+                pending = collections.deque()
+                for chunk in _chunks(paths, chunk_size):
+                    pending.append(executor.submit(_parse_chunk, chunk))
+                    if len(pending) >= max_pending:
+                        for result in results(pending.popleft()):
+                            yield result
+                while pending:
+                    for result in results(pending.popleft()):
+                        yield result
+            else:
+                pending = set()
+                for chunk in _chunks(paths, chunk_size):
+                    pending.add(executor.submit(_parse_chunk, chunk))
+                    if len(pending) >= max_pending:
+                        done, pending = futures.wait(pending, return_when=futures.FIRST_COMPLETED)
+                        for future in done:
+                            for result in results(future):
+                                yield result
+                for future in futures.as_completed(pending):
+                    for result in results(future):
+                        yield result
+
     def _load_template(self, template_name):
         """
+        :raise PathResolverError: if the templates reference each other in a
+                                  cycle
         :param str  template_name:
         :rtype: Template
         """
-        template_string = self._template_config[template_name]
+        # Referenced templates load recursively, ensure they can't recurse
+        # forever before loading any
+        self._get_graph()
+        state = self._state
+        template_string = state.template_config[template_name]
 
         tokens = {}
         parent = None
@@ -179,14 +754,20 @@ class PathResolver(object):
                     relatives.append(template)
             else:
                 # Extract local tokens, validate against loaded Tokens
-                tokens[token_name] = self._tokens[token_name]
+                tokens[token_name] = self.get_token(token_name)
         template = Template(template_name,
                             template_string,
                             parent=parent,
                             relatives=relatives,
-                            tokens=tokens)
+                            tokens=tokens,
+                            lister=self._listing_cache)
+
+        resolved_state = state.template_states.pop(template_name, None)
+        if resolved_state is not None:
+            template.restore_resolved_state(resolved_state)
 
-        self._templates[template_name] = template
+        state.templates[template_name] = template
+        state.index = None
         return template
 
     def _load_token(self, token_name):
@@ -196,9 +777,12 @@ class PathResolver(object):
         """
         # Config is allowed to define a shorthand {name: type}, ensure it's in
         # dictionary format so that the keywords can be expanded to Token's init
-        token_config = self._token_config[token_name]
+        token_config = self._state.token_config[token_name]
         if not isinstance(token_config, dict):
             token_config = {constants.TOKEN_TYPE: token_config}
+        else:
+            # Copy to avoid modifying the config
+            token_config = token_config.copy()
 
         # Pop the type key so that it's not passed to Token's init
         token_type = token_config.pop(constants.TOKEN_TYPE, 'str')
@@ -210,5 +794,142 @@ class PathResolver(object):
 
         # Let Token validate itself, will raise any errors
         token = cls(token_name, **token_config)
-        self._tokens[token_name] = token
+        self._state.tokens[token_name] = token
         return token
+
+    def _load_templates(self):
+        """ Loads all templates that have not been loaded yet """
+        # Load referenced templates first so that loading never recurses
+        templates = self._state.templates
+        for name in self._get_graph().order:
+            if name not in templates:
+                self._load_template(name)
+
+    def _load_tokens(self):
+        """ Loads all tokens that have not been loaded yet """
+        state = self._state
+        for name in state.token_config:
+            if name not in state.tokens:
+                self._load_token(name)
+
+    def _match_path(self, path, pool=None):
+        """
+        Finds the highest priority template that parses the path, see
+        parse_path. Paths that don't match any template are cheap as the index
+        does not yield candidates for them.
+
+        :param str                  path:
+        :param interning.InternPool pool:
+        :rtype: tuple[Template, dict]|None
+        """
+        for template in self._get_index().candidates(path):
+            try:
+                return template, template.parse(path, pool)
+            except ParseError:
+                # The index does not validate token values, eg, choices
+                continue
+        return None
+
+    def _restore_template_states(self, states):
+        """
+        Restores resolved template states, see Template.resolved_state. States
+        for templates that are not loaded yet are restored when they load.
+
+        :param dict[str, dict]  states:
+        """
+        for name, state in states.items():
+            template = self._state.templates.get(name)
+            if template is None:
+                self._state.template_states[name] = state
+            else:
+                template.restore_resolved_state(state)
+
+
+class _ResolverState(object):
+    """
+    Configuration of a resolver and the tokens, templates and lookups loaded
+    from it. Reloading builds a new state and replaces the resolver's state
+    with one assignment, so readers see either the old or the new state.
+    """
+    __slots__ = ('config', 'template_config', 'token_config', 'tokens', 'templates',
+                 'template_states', 'index', 'graph')
+
+    def __init__(self, config, tokens=None, templates=None, template_states=None, graph=None):
+        """
+        :param dict[str, dict]      config:
+        :param dict[str, Token]     tokens:             Loaded tokens
+        :param dict[str, Template]  templates:          Loaded templates
+        :param dict[str, dict]      template_states:    Resolved template
+                                                        states to restore once
+                                                        the template is loaded
+        :param TemplateGraph        graph:
+        """
+        self.config = config
+        self.template_config = config[constants.TEMPLATE_KEY]
+        self.token_config = config[constants.TOKEN_KEY]
+        self.tokens = {} if tokens is None else tokens
+        self.templates = {} if templates is None else templates
+        self.template_states = {} if template_states is None else template_states
+        self.index = None  # type: TemplateIndex
+        self.graph = graph  # type: TemplateGraph
+
+
+# Resolver rebuilt in each worker process by parse_paths_parallel
+_worker_resolver = None  # type: PathResolver
+
+
+def _chunks(iterator, chunk_size):
+    """
+    :param collections.Iterator iterator:
+    :param int                  chunk_size:
+    :rtype: collections.Iterator[list]
+    """
+    while True:
+        chunk = list(itertools.islice(iterator, chunk_size))
+        if not chunk:
+            return
+        yield chunk
+
+
+def _rebuild(cls, config, kwargs, frozen):
+    """
+    Rebuilds a pickled resolver, see PathResolver.__reduce__
+
+    :rtype: PathResolver
+    """
+    resolver = cls(config, **kwargs)
+    return resolver.freeze() if frozen else resolver
+
+
+def _changed_keys(old, new):
+    """
+    :param dict old:
+    :param dict new:
+    :rtype: set
+    :return: Keys that were added, removed or have a different value
+    """
+    changed = set(old).symmetric_difference(new)
+    changed.update(key for key in set(old).intersection(new) if old[key] != new[key])
+    return changed
+
+
+def _init_worker(config):
+    """
+    :param dict[str, dict]  config:
+    """
+    global _worker_resolver
+    _worker_resolver = PathResolver(config)
+
+
+def _parse_chunk(paths):
+    """
+    :param list[str]    paths:
+    :rtype: list[tuple[str, str, dict]]
+    :return: List of (path, template name, parsed fields) where unmatched
+             paths have a template name and fields of None
+    """
+    results = []
+    for path, template, fields in _worker_resolver.parse_paths(
+            paths, chunk_size=len(paths), on_error=constants.ON_ERROR_COLLECT):
+        results.append((path, template.name if template else None, fields))
+    return results
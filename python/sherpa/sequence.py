@@ -0,0 +1,120 @@
+import collections
+import itertools
+import re
+
+from sherpa.exceptions import ParseError
+
+
+FRAME_RANGE = re.compile(r'^(\d+)(?:-(\d+)(?:x(\d+))?)?$')
+
+Sequence = collections.namedtuple('Sequence', 'fields frames missing')
+Sequence.__doc__ = """
+Collapsed frame sequence
+
+:param dict fields:     Values for all fields other than the frame
+:param str  frames:     Frame range spec of the existing frames
+:param str  missing:    Frame range spec of the frames missing between the
+                        first and last frame
+"""
+
+
+def compact_frames(frames):
+    """
+    Compacts frame numbers into a frame range spec, eg, [1, 3, 5, 6, 7, 10]
+    becomes '1-5x2,6-7,10'. Duplicates are ignored.
+
+    :param frames: Any iterable of ints
+    :rtype: str
+    """
+    frames = sorted(set(frames))
+    num_frames = len(frames)
+    ranges = []
+    i = 0
+    while i < num_frames:
+        start = frames[i]
+        if i + 1 == num_frames:
+            ranges.append(str(start))
+            break
+
+        # Extend the run for as long as the step is constant
+        step = frames[i + 1] - start
+        j = i + 1
+        while j + 1 < num_frames and frames[j + 1] - frames[j] == step:
+            j += 1
+
+        # Two frames are only a range if they're consecutive, otherwise the
+        # second frame may start a better run
+        if j - i >= 2 or step == 1:
+            end = frames[j]
+            ranges.append('{}-{}'.format(start, end) if step == 1
+                          else '{}-{}x{}'.format(start, end, step))
+            i = j + 1
+        else:
+            ranges.append(str(start))
+            i += 1
+    return ','.join(ranges)
+
+
+def iter_frames(spec):
+    """
+    Lazily yields the frame numbers in a frame range spec, see parse_frame_spec
+
+    :param str  spec:
+    :rtype: collections.Iterator[int]
+    """
+    return itertools.chain.from_iterable(
+        range(start, end + 1, step) for start, end, step in parse_frame_spec(spec)
+    )
+
+
+def missing_ranges(frames):
+    """
+    Ranges of the frame numbers between the first and last frame that are
+    not in frames. Only the gaps between neighbouring frames are visited so
+    the cost doesn't depend on the size of the frame range.
+
+    :param frames: Any iterable of ints
+    :rtype: list[tuple[int, int]]
+    :return: List of inclusive (start, end) ranges
+    """
+    frames = sorted(set(frames))
+    return [(previous + 1, frame - 1) for previous, frame in zip(frames, frames[1:])
+            if frame - previous > 1]
+
+
+def missing_spec(frames):
+    """
+    Frame range spec of the frames missing between the first and last frame,
+    see missing_ranges, eg, [1, 2, 5, 7] becomes '3-4,6'.
+
+    :param frames: Any iterable of ints
+    :rtype: str
+    """
+    return ','.join(str(start) if start == end else '{}-{}'.format(start, end)
+                    for start, end in missing_ranges(frames))
+
+
+def parse_frame_spec(spec):
+    """
+    Parses a frame range spec of comma separated frames or ranges, where a
+    range is 'start-end' or 'start-endxstep', eg, '1001-1240x2,1300'. Ranges
+    are inclusive of the end frame.
+
+    :raise ParseError: if the spec is invalid
+    :param str  spec:
+    :rtype: list[tuple[int, int, int]]
+    :return: List of (start, end, step) for each comma separated item
+    """
+    ranges = []
+    for item in spec.split(','):
+        match = FRAME_RANGE.match(item.strip())
+        if match is None:
+            raise ParseError('Invalid frame range {!r} in {!r}'.format(item, spec))
+        start, end, step = match.groups()
+        start = int(start)
+        end = start if end is None else int(end)
+        step = 1 if step is None else int(step)
+        if end < start or step < 1:
+            raise ParseError('Invalid frame range {!r} in {!r}'.format(item, spec))
+        ranges.append((start, end, step))
+    return ranges
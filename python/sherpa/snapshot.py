@@ -0,0 +1,94 @@
+import hashlib
+import json
+import os
+import tempfile
+
+from sherpa import constants
+
+
+def digest(data):
+    """
+    :param bytes    data:   Raw contents of the configuration file
+    :rtype: str
+    """
+    return hashlib.sha1(data).hexdigest()
+
+
+def dump(path, config_digest, config, templates):
+    """
+    Writes a snapshot of a resolver's fully resolved state. The file is
+    replaced atomically so that concurrent processes never read a partial
+    snapshot. Failing to write is not an error as the snapshot is only an
+    optimisation.
+
+    :param str                  path:
+    :param str                  config_digest:  Digest of the configuration
+                                                file the state was built from
+    :param dict[str, dict]      config:
+    :param dict[str, Template]  templates:
+    :rtype: bool
+    :return: Whether or not the snapshot was written
+    """
+    data = {
+        'version': constants.SNAPSHOT_VERSION,
+        'digest': config_digest,
+        'config': config,
+        'templates': {name: template.resolved_state for name, template in templates.items()},
+    }
+    directory = os.path.dirname(os.path.abspath(path))
+    try:
+        if not os.path.isdir(directory):
+            os.makedirs(directory)
+        handle, tmp_path = tempfile.mkstemp(dir=directory, suffix='.tmp')
+        try:
+            with os.fdopen(handle, 'w') as f:
+                json.dump(data, f)
+            os.replace(tmp_path, path)
+        except Exception:
+            os.remove(tmp_path)
+            raise
+    except (OSError, TypeError, ValueError):
+        # TypeError/ValueError if the config contains values json can't store
+        return False
+    return True
+
+
+def load(path, config_digest):
+    """
+    Reads a snapshot if it exists and is valid for the configuration
+
+    :param str  path:
+    :param str  config_digest:  Digest of the current configuration file
+    :rtype: dict|None
+    :return: Dictionary of {'config': config, 'templates': {name: state}} or
+             None if the snapshot is missing, stale or from another version
+    """
+    try:
+        with open(path) as f:
+            data = json.load(f)
+    except (OSError, ValueError):
+        return None
+    if (not isinstance(data, dict)
+            or data.get('version') != constants.SNAPSHOT_VERSION
+            or data.get('digest') != config_digest):
+        return None
+    return data
+
+
+def snapshot_path(filepath, snapshot_dir=None):
+    """
+    Path of the snapshot file for a configuration file. Snapshots are stored
+    next to the configuration file unless a directory is given, in which case
+    the name includes a hash of the configuration's full path to avoid
+    clashing with other configurations of the same name.
+
+    :param str  filepath:       Path to the configuration file
+    :param str  snapshot_dir:   Directory to store snapshots in
+    :rtype: str
+    """
+    filepath = os.path.abspath(filepath)
+    name = os.path.basename(filepath)
+    if snapshot_dir is None:
+        return os.path.join(os.path.dirname(filepath), '.' + name + constants.SNAPSHOT_SUFFIX)
+    path_hash = hashlib.sha1(filepath.encode('utf-8')).hexdigest()[:12]
+    return os.path.join(snapshot_dir, '{}-{}{}'.format(name, path_hash, constants.SNAPSHOT_SUFFIX))
@@ -1,31 +1,63 @@
-import glob
+import collections
+import functools
+import heapq
 import os
 import re
+import string
 
-from sherpa import constants
+from sherpa import columns, constants, sequence, walker
 from sherpa.exceptions import FormatError, ParseError
-from sherpa.token import Token
+from sherpa.token import IntToken, Token
 
 
 class Template(object):
-    def __init__(self, name, path, parent=None, relatives=None, tokens=None):
+    __slots__ = ('_name', '_path', '_parent', '_relatives', '_local_tokens', '_lister',
+                 '_ordered_fields', '_pattern', '_regex', '_tokens', '_record',
+                 '_compiled_regex', '_compiled_directory_regex', '_compiled_partial_regex',
+                 '_formatter')
+
+    def __init__(self, name, path, parent=None, relatives=None, tokens=None, lister=None):
         """
-        :param str              name:
-        :param str              path:
-        :param Template         parent:
-        :param list[Template]   relatives:
-        :param dict[str, Token] tokens:
+        :param str                      name:
+        :param str                      path:
+        :param Template                 parent:
+        :param list[Template]           relatives:
+        :param dict[str, Token]         tokens:
+        :param walker.DirectoryLister   lister: Lists directories for the
+                                                methods that search the disk
         """
         self._name = name
         self._path = path
         self._parent = parent
         self._relatives = tuple(relatives or ())
         self._local_tokens = tokens
+        self._lister = lister or walker.DEFAULT_LISTER
 
         self._ordered_fields = None     # type: tuple[Token]
         self._pattern = None            # type: str
         self._regex = None              # type: str
         self._tokens = None             # type: dict[str, Token]
+        self._record = None             # type: tuple[type, tuple[str]]
+
+        self._compiled_regex = None             # type: re.Pattern
+        self._compiled_directory_regex = None   # type: re.Pattern
+        self._compiled_partial_regex = None     # type: re.Pattern
+        self._formatter = None                  # type: tuple
+
+    def __getstate__(self):
+        # Compiled regexes are cheap to rebuild and not worth pickling
+        state = {slot: getattr(self, slot) for slot in self.__slots__}
+        state['_compiled_regex'] = None
+        state['_compiled_directory_regex'] = None
+        state['_compiled_partial_regex'] = None
+        state['_formatter'] = None
+        # Generated record types can't be pickled by reference
+        state['_record'] = None
+        return state
+
+    def __setstate__(self, state):
+        for slot, value in state.items():
+            setattr(self, slot, value)
 
     def __repr__(self):
         return 'Template({!r}, {!r}, parent={}, relatives={}, tokens={})'.format(
@@ -35,6 +67,45 @@ class Template(object):
     def __str__(self):
         return '{}({})'.format(self._name, self.pattern)
 
+    @property
+    def compiled_directory_regex(self):
+        """
+        Compiled regex matching the start of a path up to a full directory,
+        used by extract(directory=True)
+
+        :rtype: re.Pattern
+        """
+        if self._compiled_directory_regex is None:
+            # If the regex already includes a trailing separator, there is no
+            # need to modify the regex, otherwise ensure the pattern only
+            # matches if it's exact or followed by a directory separator
+            suffix = '' if self.regex.endswith(os.path.sep) else '(?:$|/)'
+            self._compiled_directory_regex = re.compile('^' + self.regex + suffix)
+        return self._compiled_directory_regex
+
+    @property
+    def compiled_partial_regex(self):
+        """
+        Compiled regex matching the start of a path, used by
+        extract(directory=False)
+
+        :rtype: re.Pattern
+        """
+        if self._compiled_partial_regex is None:
+            self._compiled_partial_regex = re.compile('^' + self.regex)
+        return self._compiled_partial_regex
+
+    @property
+    def compiled_regex(self):
+        """
+        Compiled regex matching a full path, used by parse()
+
+        :rtype: re.Pattern
+        """
+        if self._compiled_regex is None:
+            self._compiled_regex = re.compile('^' + self.regex + '$')
+        return self._compiled_regex
+
     @property
     def linked_templates(self):
         """
@@ -44,6 +115,13 @@ class Template(object):
         """
         return ((self._parent, ) if self._parent else ()) + self._relatives
 
+    @property
+    def lister(self):
+        """
+        :rtype: walker.DirectoryLister
+        """
+        return self._lister
+
     @property
     def name(self):
         """
@@ -82,6 +160,22 @@ class Template(object):
             self._resolve_pattern()
         return self._pattern
 
+    @property
+    def record_type(self):
+        """
+        Namedtuple type storing the parsed value of each token in the order
+        of ordered_fields, see parse_record. Token names that are not valid
+        field names, eg, names starting with an underscore, are renamed to
+        their position.
+
+        :rtype: type
+        """
+        if self._record is None:
+            fields = tuple(collections.OrderedDict.fromkeys(self.ordered_fields))
+            typename = re.sub(r'\W|^(?=\d)', '_', self._name) + 'Record'
+            self._record = (collections.namedtuple(typename, fields, rename=True), fields)
+        return self._record[0]
+
     @property
     def regex(self):
         """
@@ -105,6 +199,20 @@ class Template(object):
         """
         return self._relatives
 
+    @property
+    def resolved_state(self):
+        """
+        Fully resolved pattern state that can be serialised and restored with
+        restore_resolved_state to skip resolving linked templates.
+
+        :rtype: dict
+        """
+        return {
+            'pattern': self.pattern,
+            'ordered_fields': list(self.ordered_fields),
+            'regex': self.regex,
+        }
+
     @property
     def tokens(self):
         """
@@ -112,6 +220,27 @@ class Template(object):
         """
         return self._get_tokens().copy()
 
+    def collapse_paths(self, paths, token_name):
+        """
+        Groups paths by all fields other than the frame token and compacts the
+        frames of each group into frame ranges, the inverse of format_range.
+
+        :raise ParseError: if a path doesn't match the template's pattern
+        :param      paths:      Any iterable of path strings
+        :param str  token_name: Name of the frame token
+        :rtype: list[sequence.Sequence]
+        """
+        groups = collections.OrderedDict()
+        for path in paths:
+            fields = self.parse(path)
+            frame = fields.pop(token_name)
+            groups.setdefault(tuple(sorted(fields.items())), []).append(frame)
+
+        return [sequence.Sequence(dict(key),
+                                  sequence.compact_frames(frames),
+                                  sequence.missing_spec(frames))
+                for key, frames in groups.items()]
+
     def extract(self, path, directory=True):
         """
         Splits the path to the part that matches the template and the relative 
@@ -125,12 +254,10 @@ class Template(object):
                                 path will strip any leading path separator.
         :rtype: tuple[str, dict, str]
         """
-        # If splitting by directory and the regex already includes a trailing 
-        # separator, there is no need to modify the regex, otherwise ensure the 
-        # pattern only matches if it's exact or followed by a directory separator
+        # The directory regex only modifies the pattern if it doesn't already
+        # include a trailing separator
         modified = directory and not self.regex.endswith(os.path.sep)
-        suffix = '(?:$|/)' if modified else ''
-        regex = '^' + self.regex + suffix
+        regex = self.compiled_directory_regex if directory else self.compiled_partial_regex
         match, fields = self._parse(path, regex)
         start = match.group(0)
         # Extract the remainder before modifying the start path - this is 
@@ -153,20 +280,73 @@ class Template(object):
         :param dict fields:
         :rtype: str
         """
-        missing = []
-        tokens = {}
-        for name, token in self._get_tokens().items():
-            # Token default is the type value, not a string. Must still be formatted
-            value = fields.get(name, token.default)
-            if value is None:
-                missing.append(name)
-            else:
-                tokens[name] = token.format(value)
-        if missing:
-            raise FormatError('Missing required fields for template {}: {}'.format(
-                self, missing
-            ))
-        return self.pattern.format(**tokens)
+        return self._format(fields, *self._get_formatter())
+
+    def format_many(self, fields_list):
+        """
+        Formats the template pattern for each set of fields, see format.
+
+        :raise FormatError: if required fields are missing and no have no default
+        :param fields_list: Any iterable of field dictionaries
+        :rtype: list[str]
+        """
+        format_string, slots, formatters = self._get_formatter()
+        _format = self._format
+        return [_format(fields, format_string, slots, formatters) for fields in fields_list]
+
+    def format_range(self, fields, token_name, frame_spec):
+        """
+        Lazily formats the template pattern for each frame in a frame range
+        spec, eg, '1001-1240x2,1300', see sequence.parse_frame_spec. The other
+        fields are only formatted once so each frame is a single string
+        operation.
+
+        :raise FormatError: if required fields are missing and no have no default
+        :raise ParseError: if the frame range spec is invalid
+        :param dict fields:         Fields for all tokens other than the frame
+        :param str  token_name:     Name of the frame token
+        :param str  frame_spec:     Frame range spec
+        :rtype: collections.Iterator[str]
+        """
+        token = self._get_tokens()[token_name]
+        frames = sequence.iter_frames(frame_spec)
+        _, slots, formatters = self._get_formatter()
+        values = self._format_values(fields, formatters, exclude=token_name)
+
+        # Padded ints can be formatted directly by the format string, any
+        # other token must validate each frame
+        direct = isinstance(token, IntToken) and not token.choices
+        frame_slot = '%0{}d'.format(token.padding) if direct else '%s'
+        frame_format = ''
+        for literal, name, _, _ in string.Formatter().parse(self.pattern):
+            frame_format += literal.replace('%', '%%')
+            if name == token_name:
+                frame_format += frame_slot
+            elif name is not None:
+                frame_format += values[name].replace('%', '%%')
+        if not direct:
+            frames = map(token.format, frames)
+
+        count = slots.count(token_name)
+        if count == 1:
+            return map(frame_format.__mod__, frames)
+        return (frame_format % ((frame, ) * count) for frame in frames)
+
+    def iter_paths(self, fields, use_defaults=False, concurrency=None):
+        """
+        Lazily yields the paths on disk that match the given fields, see paths.
+
+        :param dict fields:         Dictionary of fields and their values
+        :param bool use_defaults:   Whether or not to use default token values
+                                    for missing fields instead of wildcards.
+        :param int  concurrency:    If given, directories are listed
+                                    concurrently by up to this many threads
+                                    and paths are yielded as they are found
+                                    instead of in sorted order.
+        :rtype: collections.Iterator[str]
+        """
+        for path, _ in self._walk(fields, use_defaults, concurrency):
+            yield os.path.normpath(path)
 
     def join(self, template):
         """
@@ -199,9 +379,25 @@ class Template(object):
                                    self._path + joiner + path,
                                    parent=self._parent,
                                    relatives=relatives,
-                                   tokens=tokens)
+                                   tokens=tokens,
+                                   lister=self._lister)
         return joined_template
 
+    def latest(self, field, fields, use_defaults=False):
+        """
+        Finds the path on disk with the highest value for the field that
+        matches the given fields, eg, the latest version.
+
+        :param str                  field:
+        :param dict[str, object]    fields:
+        :param bool                 use_defaults:
+        :rtype: tuple[object, str]|None
+        :return: Tuple of (value, path) or None if no paths match
+        """
+        values = self.sorted_values(field, fields, reverse=True, limit=1,
+                                    use_defaults=use_defaults)
+        return values[0] if values else None
+
     def missing(self, fields, ignore_defaults=True):
         """
         :param      fields:             Any iterable of strings
@@ -212,50 +408,318 @@ class Template(object):
         return {f: t for f, t in self._get_tokens().items()
                 if f not in fields and (ignore_defaults or t.default is not None)}
 
-    def parse(self, path):
+    def parse(self, path, pool=None):
         """
         Parses the path against the pattern, extracting a dictionary of the
         fields and their values.
 
         :raise ParseError: if the path doesn't match the template's pattern
-        :param str  path:
+        :param str                      path:
+        :param interning.InternPool     pool:   Optional pool to share equal
+                                                values between parse results
         :rtype: dict[str, object]
         """
-        _, fields = self._parse(path, '^' + self.regex + '$')
+        _, fields = self._parse(path, self.compiled_regex, pool)
         return fields
 
-    def paths(self, fields, use_defaults=False):
+    def parse_columns(self, paths):
+        """
+        Parses many paths into one column per token in ordered_fields order
+        instead of a dictionary per path, see columns.parse_columns. Paths
+        that don't match the template are unset in the mask.
+
+        :param paths: Any iterable of path strings
+        :rtype: columns.ParsedColumns
+        """
+        parse = self.parse
+
+        def match(path):
+            try:
+                return 0, parse(path)
+            except ParseError:
+                return None
+
+        return columns.parse_columns(paths, match, (self, ))
+
+    def parse_record(self, path, pool=None):
+        """
+        Parses the path like parse, but returns the fields as a record_type
+        instance which is much smaller than a dictionary when keeping many
+        parsed paths in memory.
+
+        :raise ParseError: if the path doesn't match the template's pattern
+        :param str                      path:
+        :param interning.InternPool     pool:   Optional pool to share equal
+                                                values between parse results
+        :rtype: tuple
+        """
+        record_type = self.record_type
+        _, fields = self._parse(path, self.compiled_regex, pool)
+        return record_type._make([fields[name] for name in self._record[1]])
+
+    def paths(self, fields, use_defaults=False, concurrency=None):
         """
         Returns the paths on disk that match the given fields by using wildcards
         for missing values.
 
+        The filesystem is walked one directory at a time, only listing the
+        directories where a field is missing and only descending into entries
+        that match the missing tokens' regex and choices.
+
         :param dict fields:         Dictionary of fields and their values
         :param bool use_defaults:   Whether or not to use default token values
                                     for missing fields instead of wildcards.
+        :param int  concurrency:    If given, directories are listed
+                                    concurrently by up to this many threads,
+                                    eg, to hide the latency of network storage.
         :rtype: list[str]
         """
-        tokens = fields.copy()
-        for f, t in self.missing(fields, ignore_defaults=True).items():
-            # Default value might be None; in either case, fallback on wildcard
-            tokens[f] = (t.default if use_defaults else None) or constants.WILDCARD
+        paths = list(self.iter_paths(fields, use_defaults, concurrency))
+        if concurrency:
+            paths.sort()
+        return paths
+
+    def reset(self):
+        """
+        Clears all lazily resolved state, ie, the pattern, regexes and tokens,
+        so that it is rebuilt from the current linked templates on next access.
+        Must be called if any linked template changes.
+        """
+        self._ordered_fields = None
+        self._pattern = None
+        self._regex = None
+        self._tokens = None
+        self._record = None
+
+        self._compiled_regex = None
+        self._compiled_directory_regex = None
+        self._compiled_partial_regex = None
+        self._formatter = None
+
+    def resolve(self):
+        """
+        Resolves all lazily loaded state up front, ie, the pattern, tokens,
+        regexes, formatter and record type. A resolved template is only read
+        from, so it can be shared between threads without locking.
+        """
+        for token in self._get_tokens().values():
+            token.compiled_regex
+        self.ordered_fields
+        self.compiled_regex
+        self.compiled_directory_regex
+        self.compiled_partial_regex
+        self._get_formatter()
+        self.record_type
+
+    def restore_resolved_state(self, state):
+        """
+        Restores the pattern state from resolved_state. The state must have
+        been resolved from the same configuration.
+
+        :param dict state:
+        """
+        self.reset()
+        self._pattern = state['pattern']
+        self._ordered_fields = tuple(state['ordered_fields'])
+        self._regex = state['regex']
+
+    def sequences(self, fields, token_name, use_defaults=False):
+        """
+        Finds all paths on disk that match the given fields and collapses them
+        into frame sequences while searching, ie, without building the list of
+        every frame's path. Paths are grouped by the values of all missing
+        fields other than the frame token.
+
+        :param dict[str, object]    fields:
+        :param str                  token_name:     Name of the frame token
+        :param bool                 use_defaults:
+        :rtype: list[sequence.Sequence]
+        """
+        tokens = self._get_tokens()
+        frame_token = tokens[token_name]
+        known = {name: value for name, value in fields.items()
+                 if name in tokens and name != token_name
+                 and value not in (constants.WILDCARD, constants.WILDCARD_ONE)}
+        if use_defaults:
+            # Defaulted tokens are literal in the search, so they're never
+            # captured and have to be added the same way _segments fills them
+            for name, token in tokens.items():
+                if name != token_name and fields.get(name) is None and token.default is not None:
+                    known[name] = token.default
+
+        groups = collections.OrderedDict()
+        search_fields = self._wildcard_fields((token_name, ), fields)
+        for _, captured in self._walk(search_fields, use_defaults):
+            frame = frame_token.parse(captured.pop(token_name))
+            key = tuple(sorted(captured.items()))
+            frames = groups.get(key)
+            if frames is None:
+                frames = groups[key] = set()
+            frames.add(frame)
+
+        sequences = []
+        for key, frames in groups.items():
+            sequence_fields = known.copy()
+            sequence_fields.update((name, tokens[name].parse(value)) for name, value in key)
+            sequences.append(sequence.Sequence(
+                sequence_fields,
+                sequence.compact_frames(frames),
+                sequence.missing_spec(frames)
+            ))
+        return sequences
+
+    def sorted_values(self, field, fields, reverse=True, limit=None, use_defaults=False):
+        """
+        Finds all paths on disk that match the given fields and returns the
+        unique values for the requested field sorted by value, with a path for
+        each value, see values_from_paths.
+
+        Matches are streamed and only the best limit values are kept. If the
+        field belongs to the first directory that needs listing, eg, only the
+        version is missing, directories are visited in order of value and the
+        search stops as soon as the limit is reached.
 
-        pattern = self.format(tokens)
-        return [os.path.normpath(p) for p in glob.iglob(pattern)]
+        :param str                  field:
+        :param dict[str, object]    fields:
+        :param bool                 reverse:        If True, sorts from highest
+                                                    to lowest value
+        :param int                  limit:          Maximum number of values
+        :param bool                 use_defaults:
+        :rtype: list[tuple[object, str]]
+        :return: List of (value, path)
+        """
+        token = self._get_tokens()[field]
+        order = (field, token.parse, reverse)
+        results = self._iter_values((field, ), fields, use_defaults, order=order)
+
+        if limit is None:
+            values = {}
+            for (value, ), path in results:
+                values.setdefault(value, path)
+            return sorted(values.items(), key=lambda item: item[0], reverse=reverse)
+
+        if limit < 1:
+            return []
+
+        search_fields = self._wildcard_fields((field, ), fields)
+        if walker.is_ordered_by(self._segments(search_fields, use_defaults), field):
+            # Values are found in order, stop once there are enough
+            values = {}
+            for (value, ), path in results:
+                values.setdefault(value, path)
+                if len(values) == limit:
+                    break
+            return list(values.items())
+
+        # Bounded heap of the best values, the root is the worst value kept
+        key = None if reverse else functools.cmp_to_key(lambda a, b: (a < b) - (a > b))
+        heap = []
+        paths = {}
+        for (value, ), path in results:
+            if value in paths:
+                continue
+            rank = value if key is None else key(value)
+            if len(heap) < limit:
+                heapq.heappush(heap, (rank, value))
+            elif rank > heap[0][0]:
+                _, removed = heapq.heapreplace(heap, (rank, value))
+                del paths[removed]
+            else:
+                continue
+            paths[value] = path
+        return sorted(paths.items(), key=lambda item: item[0], reverse=reverse)
 
     def values_from_paths(self, field, fields, use_defaults=False):
         """
         Finds all paths on disk that match the given fields and extracts the
-        value for the requested field in each path.
+        value for the requested field in each path. Only the requested field is
+        converted from the values captured while searching the disk, paths are
+        not parsed again.
 
         :param str                  field:
         :param dict[str, object]    fields:
         :param bool                 use_defaults:
         :rtype: dict[object, str]
         """
-        fields[field] = constants.WILDCARD
-        paths = self.paths(fields, use_defaults)
-        path_fields = {self.parse(p)[field]: p for p in paths}
-        return path_fields
+        return {values[0]: path
+                for values, path in self._iter_values((field, ), fields, use_defaults)}
+
+    def values_from_paths_multi(self, fields_wanted, fields, use_defaults=False):
+        """
+        Finds all paths on disk that match the given fields and extracts the
+        values for each of the requested fields in each path, see
+        values_from_paths.
+
+        :param list[str]            fields_wanted:
+        :param dict[str, object]    fields:
+        :param bool                 use_defaults:
+        :rtype: dict[tuple, str]
+        :return: Dictionary of {tuple of values in fields_wanted order: path}
+        """
+        return dict(self._iter_values(fields_wanted, fields, use_defaults))
+
+    def _format(self, fields, format_string, slots, formatters):
+        """
+        :param dict         fields:
+        :param str          format_string:  See _get_formatter
+        :param tuple[str]   slots:          See _get_formatter
+        :param tuple        formatters:     See _get_formatter
+        :rtype: str
+        """
+        values = self._format_values(fields, formatters)
+        return format_string % tuple([values[name] for name in slots])
+
+    def _format_values(self, fields, formatters, exclude=None):
+        """
+        :raise FormatError: if required fields are missing and no have no default
+        :param dict     fields:
+        :param tuple    formatters: See _get_formatter
+        :param str      exclude:    Name of a token to skip
+        :rtype: dict[str, str]
+        :return: Dictionary of formatted values for each token
+        """
+        missing = []
+        values = {}
+        for name, formatter, default in formatters:
+            if name == exclude:
+                continue
+            # Token default is the type value, not a string. Must still be formatted
+            value = fields.get(name, default)
+            if value is None:
+                missing.append(name)
+            else:
+                values[name] = formatter(value)
+        if missing:
+            raise FormatError('Missing required fields for template {}: {}'.format(
+                self, missing
+            ))
+        return values
+
+    def _get_formatter(self):
+        """
+        Lazy compiles the pattern into a printf-style format string with a
+        slot for each token, so that formatting doesn't need to parse the
+        pattern each time.
+
+        :rtype: tuple[str, tuple[str], tuple]
+        :return: Tuple of (
+            format string,
+            token name for each slot in the format string,
+            tuple of (token name, token format method, token default)
+        )
+        """
+        if self._formatter is None:
+            format_string = ''
+            slots = []
+            for literal, name, _, _ in string.Formatter().parse(self.pattern):
+                format_string += literal.replace('%', '%%')
+                if name is not None:
+                    format_string += '%s'
+                    slots.append(name)
+            formatters = tuple((name, token.format, token.default)
+                               for name, token in self._get_tokens().items())
+            self._formatter = (format_string, tuple(slots), formatters)
+        return self._formatter
 
     def _get_tokens(self):
         """
@@ -271,11 +735,30 @@ class Template(object):
             self._tokens = tokens
         return self._tokens
 
-    def _parse(self, path, regex):
-        # type: (str, str) -> tuple[re.Match, dict]
+    def _iter_values(self, fields_wanted, fields, use_defaults=False, order=None):
+        """
+        Walks the filesystem for paths matching the fields with the wanted
+        fields as wildcards, converting only the wanted fields' values.
+
+        :param list[str]            fields_wanted:
+        :param dict[str, object]    fields:
+        :param bool                 use_defaults:
+        :param                      order:          See walker.walk
+        :rtype: collections.Iterator[tuple[tuple, str]]
+        :return: Iterator of (tuple of values in fields_wanted order, path)
+        """
+        tokens = self._get_tokens()
+        wanted = [(name, tokens[name]) for name in fields_wanted]
+        search_fields = self._wildcard_fields(fields_wanted, fields)
+        for path, captured in self._walk(search_fields, use_defaults, order=order):
+            values = tuple(token.parse(captured[name]) for name, token in wanted)
+            yield values, os.path.normpath(path)
+
+    def _parse(self, path, regex, pool=None):
+        # type: (str, re.Pattern, interning.InternPool) -> tuple[re.Match, dict]
         """ Matches the pattern to the path, returning the match and fields """
         path = path.replace(os.path.sep, '/')
-        match = re.match(regex, path)
+        match = regex.match(path)
         if match is None:
             raise ParseError('Path {!r} does not match Template: {}'.format(path, self))
 
@@ -290,6 +773,10 @@ class Template(object):
                 ))
             fields[field] = parsed
 
+        if pool is not None:
+            intern = pool.intern
+            for field, value in fields.items():
+                fields[field] = intern(value)
         return match, fields
 
     def _resolve_pattern(self):
@@ -301,7 +788,7 @@ class Template(object):
         # Walk through this template's string and replace any references to
         # other templates with that template's pattern.
         last_idx = 0
-        self._pattern = ''
+        pattern = ''
         for match in constants.MATCH_PATTERN.finditer(self._path):
             # We only care about templates, preserve token patterns
             is_template, name = match.groups()
@@ -316,9 +803,63 @@ class Template(object):
             start, end = match.span()
             relative_template = linked_templates[name]
             ordered_fields += relative_template.ordered_fields
-            self._pattern += self._path[last_idx:start] + relative_template.pattern
+            pattern += self._path[last_idx:start] + relative_template.pattern
             last_idx = end
 
-        # Add any remaining path
-        self._pattern += self._path[last_idx:]
+        # Add any remaining path. The pattern is only assigned once complete,
+        # and after the ordered fields, so that other threads never see a
+        # partially resolved template.
+        pattern += self._path[last_idx:]
         self._ordered_fields = tuple(ordered_fields)
+        self._pattern = pattern
+
+    def _segments(self, fields, use_defaults=False):
+        """
+        Splits the pattern into segments for walking the filesystem, see
+        walker.compile_segments
+
+        :param dict fields:
+        :param bool use_defaults:
+        :rtype: list[walker.Segment]
+        """
+        tokens = self._get_tokens()
+        formatted = {}
+        for name, token in tokens.items():
+            value = fields.get(name)
+            # Explicit wildcard values are always missing, even if using defaults
+            if value in (constants.WILDCARD, constants.WILDCARD_ONE):
+                continue
+            if value is None and use_defaults:
+                value = token.default
+            if value is not None:
+                formatted[name] = token.format(value)
+
+        return walker.compile_segments(self.pattern, tokens, formatted)
+
+    def _walk(self, fields, use_defaults=False, concurrency=None, order=None):
+        """
+        Walks the filesystem for paths matching the fields, see walker.walk
+
+        :param dict fields:
+        :param bool use_defaults:
+        :param int  concurrency:
+        :param      order:          See walker.walk, only for sequential walks
+        :rtype: collections.Iterator[tuple[str, dict[str, str]]]
+        :return: Iterator of (path, captured string values of the missing fields)
+        """
+        segments = self._segments(fields, use_defaults)
+        if concurrency:
+            return walker.walk_concurrent(segments, self._lister, concurrency)
+        return walker.walk(segments, self._lister, order=order)
+
+    def _wildcard_fields(self, fields_wanted, fields):
+        """
+        :param list[str]            fields_wanted:
+        :param dict[str, object]    fields:
+        :rtype: dict[str, object]
+        :return: Copy of fields where the wanted fields are wildcards
+        """
+        search_fields = fields.copy()
+        for name in fields_wanted:
+            search_fields[name] = constants.WILDCARD
+        return search_fields
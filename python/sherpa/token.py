@@ -5,6 +5,8 @@ from sherpa.exceptions import FormatError, ParseError
 
 
 class Token(object):
+    __slots__ = ('_name', '_default', '_choices', '_ordered_choices', '_choice_strings',
+                 '_choices_regex', '_padding', '_compiled_regex')
     type = None  # type: type
 
     @classmethod
@@ -24,26 +26,53 @@ class Token(object):
         """
         self._name = name
         self._default = None
-        self._choices = None
+        # Choices are kept in declaration order for display, and as a set for
+        # fast validation
+        self._choices = None  # type: frozenset
+        self._ordered_choices = None  # type: tuple
+        self._choice_strings = None  # type: frozenset
+        self._choices_regex = None  # type: str
         self._padding = padding or 0
+        self._compiled_regex = None  # type: re.Pattern
 
         # Ensure the default value is a valid choice, and all valid values are the correct type
         if choices:
             if default and default not in choices:
                 raise ValueError('Invalid default value for token {}'.format(name))
-            self._choices = [self.parse(str(token)) for token in choices]
+            ordered = [self.parse(str(token)) for token in choices]
+            self._ordered_choices = tuple(ordered)
+            self._choices = frozenset(ordered)
+            self._choice_strings = frozenset(self.format(choice) for choice in ordered)
+            # Large alternations are slow to compile into every template's
+            # regex, above the limit values are only checked against the set
+            if len(self._choice_strings) <= constants.CHOICE_REGEX_LIMIT:
+                # Longest first so that no choice is shadowed by its own prefix
+                strings = sorted(self._choice_strings, key=lambda c: (-len(c), c))
+                self._choices_regex = '(?:{})'.format('|'.join(re.escape(c) for c in strings))
+            # Parsing the choices compiled the regex without them
+            self._compiled_regex = None
 
         # Convert to the token's type, raise error if an invalid type
         if default:
             self._default = self.parse(default)
 
+    def __getstate__(self):
+        # Compiled regexes are cheap to rebuild and not worth pickling
+        state = {slot: getattr(self, slot) for slot in Token.__slots__}
+        state['_compiled_regex'] = None
+        return state
+
+    def __setstate__(self, state):
+        for slot, value in state.items():
+            setattr(self, slot, value)
+
     def __repr__(self):
         return "{cls}({name!r}, {default!r}, {padding!r}, {choices!r})".format(
             cls=self.__class__.__name__,
             name=self._name,
             default=self._default,
             padding=self._padding,
-            choices=self._choices,
+            choices=self.choices,
         )
 
     def __str__(self):
@@ -54,7 +83,27 @@ class Token(object):
         """
         :rtype: list
         """
-        return self._choices[:] if self._choices else None
+        return list(self._ordered_choices) if self._choices else None
+
+    @property
+    def choice_strings(self):
+        """
+        Formatted choices, for validating strings without parsing them
+
+        :rtype: frozenset[str]|None
+        """
+        return self._choice_strings
+
+    @property
+    def compiled_regex(self):
+        """
+        Compiled regex validating a full string value
+
+        :rtype: re.Pattern
+        """
+        if self._compiled_regex is None:
+            self._compiled_regex = re.compile('^' + self.regex + '$')
+        return self._compiled_regex
 
     @property
     def default(self):
@@ -80,6 +129,21 @@ class Token(object):
     @property
     def regex(self):
         """
+        Regex matching a formatted value. Tokens with at most
+        CHOICE_REGEX_LIMIT choices only match the formatted choices, tokens
+        with more match any value and rely on parse to check the choices.
+
+        :rtype: str
+        """
+        if self._choices_regex is not None:
+            return self._choices_regex
+        return self.value_regex
+
+    @property
+    def value_regex(self):
+        """
+        Regex matching any formatted value of the token's type
+
         :rtype: str
         """
         raise NotImplementedError
@@ -106,7 +170,7 @@ class Token(object):
         if self._choices and value not in self._choices:
             raise FormatError(
                 'Invalid value for {self}: {value}. Valid values: {choices}'.format(
-                    self=self, value=value, choices=self._choices
+                    self=self, value=value, choices=self.choices
                 )
             )
         string = str(value)
@@ -120,7 +184,7 @@ class Token(object):
         :return:
         """
         try:
-            match = re.match('^' + self.regex + '$', token)
+            match = self.compiled_regex.match(token)
             if match is None:
                 raise ValueError
             token = self.type(token)
@@ -131,17 +195,18 @@ class Token(object):
         if self._choices and token not in self._choices:
             raise ParseError(
                 'Invalid value for token {self}: {value}. Valid values: {choices}'.format(
-                    self=self, value=token, choices=self._choices
+                    self=self, value=token, choices=self.choices
                 )
             )
         return token
 
 
 class FloatToken(Token):
+    __slots__ = ()
     type = float
 
     @property
-    def regex(self):
+    def value_regex(self):
         """
         :rtype: str
         """
@@ -180,10 +245,11 @@ class FloatToken(Token):
 
 
 class IntToken(Token):
+    __slots__ = ()
     type = int
 
     @property
-    def regex(self):
+    def value_regex(self):
         """
         :rtype: str
         """
@@ -219,8 +285,9 @@ class IntToken(Token):
 
 
 class StringToken(Token):
+    __slots__ = ()
     type = str
-    regex = '[^/.]+'
+    value_regex = '[^/.]+'
 
 
 class SequenceToken(IntToken):
@@ -229,6 +296,8 @@ class SequenceToken(IntToken):
     otherwise is treated as an IntToken. Padding defaults to 1 for a
     SequenceToken.
     """
+    __slots__ = ()
+
     def __init__(self, name, default=None, choices=None, padding=1):
         super(SequenceToken, self).__init__(name, default=default, choices=choices, padding=padding)
 
@@ -0,0 +1,405 @@
+import itertools
+import os
+import re
+from concurrent import futures
+
+from sherpa import constants
+
+
+class Segment(object):
+    """
+    Single directory component of a template pattern. A segment is either a
+    literal name when all of its tokens have a value, or a regex capturing the
+    values of its missing tokens.
+    """
+    __slots__ = ('literal', 'regex', 'fields', 'hidden', 'pattern', 'known', 'names', 'choices')
+
+    def __init__(self, literal=None, regex=None, fields=(), hidden=False,
+                 pattern=None, known=None, names=None, choices=None):
+        """
+        :param str              literal:    Exact name of the path component
+        :param re.Pattern       regex:      Regex the path component must match
+        :param tuple[str]       fields:     Names of the token for each regex
+                                            group
+        :param bool             hidden:     Whether hidden names, ie, names
+                                            starting with a '.', can be matched
+                                            by the regex
+        :param str              pattern:    Component pattern using {token}
+                                            names, used to resolve the literal
+                                            name once all fields are captured
+        :param dict[str, str]   known:      Formatted values of known tokens
+        :param tuple[str]       names:      Every name the segment can match
+                                            if its missing tokens only have a
+                                            few choices, these are checked
+                                            directly instead of listing the
+                                            directory
+        :param dict[str, frozenset[str]] choices:   Formatted choices of the
+                                            captured tokens with choices, as
+                                            the regex doesn't match only the
+                                            choices of tokens with many
+        """
+        self.literal = literal
+        self.regex = regex
+        self.fields = fields
+        self.hidden = hidden
+        self.pattern = pattern
+        self.known = known
+        self.names = names
+        self.choices = choices or {}
+
+    def __repr__(self):
+        return 'Segment(literal={!r}, regex={!r}, fields={!r}, hidden={!r})'.format(
+            self.literal, self.regex and self.regex.pattern, self.fields, self.hidden
+        )
+
+    def resolve(self, captured):
+        """
+        Literal name of the path component if it can be determined without
+        listing its directory, ie, if all of its tokens have a known or
+        captured value.
+
+        :param dict[str, str]   captured:   Values captured by previous segments
+        :rtype: str|None
+        """
+        if self.regex is None:
+            return self.literal
+        for field in self.fields:
+            if field not in captured:
+                return None
+        values = self.known.copy()
+        values.update(captured)
+        return self.pattern.format(**values)
+
+    def match(self, name, captured):
+        """
+        Matches a path component against the segment.
+
+        :param str              name:
+        :param dict[str, str]   captured:   Values captured by previous segments
+        :rtype: dict[str, str]|None
+        :return: Updated copy of the captured values, or None if the name
+                 does not match
+        """
+        if not self.hidden and name.startswith('.'):
+            return None
+        match = self.regex.match(name)
+        if match is None:
+            return None
+
+        captured = captured.copy()
+        for field, value in zip(self.fields, match.groups()):
+            choices = self.choices.get(field)
+            if choices is not None and value not in choices:
+                return None
+            # Tokens that appear multiple times must use the same value
+            existing = captured.setdefault(field, value)
+            if existing != value:
+                return None
+        return captured
+
+
+class DirectoryLister(object):
+    """
+    Lists the contents of directories for the walker. Subclasses can override
+    listdir to add caching or instrumentation.
+    """
+
+    def exists(self, path):
+        """
+        :param str  path:
+        :rtype: bool
+        """
+        return os.path.lexists(path)
+
+    def listdir(self, path):
+        """
+        Lists the entries of a directory, sorted by name. A path that doesn't
+        exist or isn't a directory has no entries.
+
+        :param str  path:
+        :rtype: list[tuple[str, bool]]
+        :return: List of (name, is directory)
+        """
+        try:
+            with os.scandir(path) as iterator:
+                entries = [(entry.name, entry.is_dir()) for entry in iterator]
+        except OSError:
+            return []
+        entries.sort()
+        return entries
+
+
+def compile_segments(pattern, tokens, fields):
+    """
+    Splits a template pattern into a Segment for each directory component.
+
+    Tokens with a value are formatted as literal text. Missing tokens are
+    matched using their regex and their captured values checked against the
+    formatted choices if the token has choices. If every missing token in a
+    segment has choices and they expand to at most CHOICE_PROBE_LIMIT names,
+    the segment stores the names so that the walker can check each one
+    instead of listing the directory.
+
+    :param str              pattern:    Template pattern using {token} names
+    :param dict[str, Token] tokens:     Tokens used by the pattern
+    :param dict[str, str]   fields:     Formatted values for the known tokens
+    :rtype: list[Segment]
+    """
+    segments = []
+    for component in pattern.split('/'):
+        regex = ''
+        names = []
+        last_idx = 0
+        for match in constants.MATCH_PATTERN.finditer(component):
+            _, name = match.groups()
+            start, end = match.span()
+            regex += re.escape(component[last_idx:start])
+            last_idx = end
+            if name in fields:
+                regex += re.escape(fields[name])
+                continue
+
+            regex += '({})'.format(tokens[name].regex)
+            names.append(name)
+
+        if names:
+            regex += re.escape(component[last_idx:])
+            segments.append(Segment(regex=re.compile(regex + '$'),
+                                    fields=tuple(names),
+                                    hidden=component.startswith('.'),
+                                    pattern=component,
+                                    known=fields,
+                                    names=_expand_choices(component, tokens, fields, names),
+                                    choices={name: tokens[name].choice_strings for name in names
+                                             if tokens[name].choice_strings is not None}))
+        else:
+            segments.append(Segment(literal=component.format(**fields)))
+    return segments
+
+
+def is_ordered_by(segments, field):
+    """
+    Whether walking the segments with an order on the field yields all paths
+    in the order of the field's value, ie, the field is captured by the first
+    segment that lists a directory.
+
+    :param list[Segment]    segments:
+    :param str              field:
+    :rtype: bool
+    """
+    for segment in segments:
+        if segment.regex is not None:
+            return field in segment.fields
+    return False
+
+
+def walk(segments, lister=None, order=None):
+    """
+    Walks the filesystem one path component at a time, only listing the
+    directories that contain a segment with missing tokens. Literal segments,
+    including segments whose tokens were captured by a previous segment, are
+    joined without listing their parent directory.
+
+    :param list[Segment]    segments:
+    :param DirectoryLister  lister:
+    :param tuple            order:      Optional (field, key, reverse) to
+                                        visit the entries matching the field's
+                                        segment in order of key(value) instead
+                                        of by name, see is_ordered_by
+    :rtype: collections.Iterator[tuple[str, dict[str, str]]]
+    :return: Iterator of (path, captured string values of the missing tokens)
+             in sorted order
+    """
+    lister = lister or DEFAULT_LISTER
+    num_segments = len(segments)
+    # Each entry is (segment index, path so far, captured values). A path of
+    # None is the current directory, '' is the filesystem root.
+    stack = [(0, None, {})]
+    while stack:
+        index, path, captured = _advance(segments, *stack.pop())
+        if index == num_segments:
+            if lister.exists(path):
+                yield path, captured
+            continue
+
+        entries = _list_entries(segments[index], lister, path)
+        found, children = _match_entries(segments, index, path, captured, entries)
+        if order is not None and order[0] in segments[index].fields:
+            field, key, reverse = order
+            found.sort(key=lambda item: key(item[1][field]), reverse=reverse)
+            children.sort(key=lambda item: key(item[2][field]), reverse=reverse)
+        for result in found:
+            yield result
+        # Reversed so that they are popped in sorted order
+        stack.extend(reversed(children))
+
+
+def walk_concurrent(segments, lister=None, concurrency=constants.CONCURRENCY):
+    """
+    Walks the filesystem like walk, but lists directories concurrently using a
+    bounded pool of threads with one task per pending directory. This hides
+    the latency of listing directories on network storage.
+
+    :param list[Segment]    segments:
+    :param DirectoryLister  lister:
+    :param int              concurrency:    Maximum number of directories to
+                                            list at the same time
+    :rtype: collections.Iterator[tuple[str, dict[str, str]]]
+    :return: Iterator of (path, captured string values of the missing tokens)
+             in the order they are found
+    """
+    lister = lister or DEFAULT_LISTER
+    num_segments = len(segments)
+    pending = {}
+
+    with futures.ThreadPoolExecutor(max_workers=concurrency) as executor:
+        def submit(index, path, captured):
+            index, path, captured = _advance(segments, index, path, captured)
+            if index == num_segments:
+                future = executor.submit(lister.exists, path)
+            else:
+                future = executor.submit(_list_entries, segments[index], lister, path)
+            pending[future] = (index, path, captured)
+
+        try:
+            submit(0, None, {})
+            while pending:
+                done, _ = futures.wait(pending, return_when=futures.FIRST_COMPLETED)
+                for future in done:
+                    index, path, captured = pending.pop(future)
+                    if index == num_segments:
+                        if future.result():
+                            yield path, captured
+                        continue
+
+                    found, children = _match_entries(
+                        segments, index, path, captured, future.result()
+                    )
+                    for child in children:
+                        submit(*child)
+                    for result in found:
+                        yield result
+        finally:
+            # Stop any outstanding listings if the caller stops iterating early
+            for future in pending:
+                future.cancel()
+
+
+def _advance(segments, index, path, captured):
+    """
+    Joins all consecutive segments from index that resolve to a literal name
+
+    :param list[Segment]    segments:
+    :param int              index:
+    :param str|None         path:
+    :param dict[str, str]   captured:
+    :rtype: tuple[int, str, dict[str, str]]
+    :return: Tuple of (index of the next segment to list, path, captured)
+    """
+    num_segments = len(segments)
+    while index < num_segments:
+        literal = segments[index].resolve(captured)
+        if literal is None:
+            break
+        path = _join(path, literal)
+        index += 1
+    return index, path, captured
+
+
+def _directory(path):
+    """
+    :param str|None path:
+    :rtype: str
+    """
+    return path or ('.' if path is None else '/')
+
+
+def _list_entries(segment, lister, path):
+    """
+    Lists the entries of the directory at path that could match the segment.
+    Segments with a few known names check each name exists instead of
+    listing the directory.
+
+    :param Segment          segment:
+    :param DirectoryLister  lister:
+    :param str|None         path:
+    :rtype: list[tuple[str, bool]]
+    :return: List of (name, is directory), where checked names are assumed to
+             be directories as their children are checked anyway
+    """
+    if segment.names is None:
+        return lister.listdir(_directory(path))
+    return [(name, True) for name in segment.names if lister.exists(_join(path, name))]
+
+
+def _match_entries(segments, index, path, captured, entries):
+    """
+    Matches the entries of a listed directory against the segment at index
+
+    :param list[Segment]            segments:
+    :param int                      index:
+    :param str|None                 path:
+    :param dict[str, str]           captured:
+    :param list[tuple[str, bool]]   entries:
+    :rtype: tuple[list, list]
+    :return: Tuple of (
+        list of (path, captured) for complete matches,
+        list of (next index, path, captured) for directories to descend into
+    )
+    """
+    segment = segments[index]
+    is_last = index == len(segments) - 1
+    found = []
+    children = []
+    for name, is_dir in entries:
+        if not (is_last or is_dir):
+            continue
+        values = segment.match(name, captured)
+        if values is None:
+            continue
+        if is_last:
+            found.append((_join(path, name), values))
+        else:
+            children.append((index + 1, _join(path, name), values))
+    return found, children
+
+
+def _expand_choices(component, tokens, fields, names):
+    """
+    :param str              component:
+    :param dict[str, Token] tokens:
+    :param dict[str, str]   fields:
+    :param list[str]        names:      Names of the missing tokens
+    :rtype: tuple[str]|None
+    :return: Sorted names the component can format to, or None if a missing
+             token has no choices or there are too many names
+    """
+    choices = []
+    num_names = 1
+    for name in set(names):
+        token_choices = tokens[name].choices
+        if not token_choices:
+            return None
+        num_names *= len(token_choices)
+        if num_names > constants.CHOICE_PROBE_LIMIT:
+            return None
+        choices.append([(name, tokens[name].format(c)) for c in token_choices])
+
+    expanded = set()
+    for combination in itertools.product(*choices):
+        values = fields.copy()
+        values.update(combination)
+        expanded.add(component.format(**values))
+    return tuple(sorted(expanded))
+
+
+def _join(path, name):
+    """
+    :param str|None path:
+    :param str      name:
+    :rtype: str
+    """
+    return name if path is None else path + '/' + name
+
+
+DEFAULT_LISTER = DirectoryLister()
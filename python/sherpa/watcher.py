@@ -0,0 +1,97 @@
+import logging
+import os
+import threading
+
+from sherpa import constants
+
+
+LOG = logging.getLogger(__name__)
+
+
+class ConfigWatcher(object):
+    """
+    Polls a resolver's source configuration files and reloads the resolver
+    when any of them change. Polling is used instead of filesystem events so
+    that it works on any filesystem, including network storage.
+    """
+
+    def __init__(self, resolver, interval=constants.WATCH_INTERVAL):
+        """
+        :param PathResolver resolver:
+        :param float        interval:   Seconds between polls
+        """
+        self._resolver = resolver
+        self._interval = interval
+        self._signatures = self._get_signatures()
+        self._stop_event = threading.Event()
+        self._thread = None     # type: threading.Thread
+
+    @property
+    def interval(self):
+        """
+        :rtype: float
+        """
+        return self._interval
+
+    @property
+    def is_running(self):
+        """
+        :rtype: bool
+        """
+        return self._thread is not None and self._thread.is_alive()
+
+    def check(self):
+        """
+        Reloads the resolver if any source file changed since the last check.
+        A configuration that fails to load is logged and the resolver keeps
+        its current state, it will be retried once the file changes again.
+
+        :rtype: bool
+        :return: Whether or not the resolver was reloaded
+        """
+        signatures = self._get_signatures()
+        if signatures == self._signatures:
+            return False
+
+        self._signatures = signatures
+        try:
+            self._resolver.reload()
+        except Exception:
+            LOG.exception('Failed to reload configuration: %s', self._resolver.sources)
+            return False
+        return True
+
+    def start(self):
+        """ Starts polling in a daemon thread """
+        if self.is_running:
+            return
+        self._stop_event.clear()
+        self._thread = threading.Thread(target=self._run, name='sherpa-config-watcher')
+        self._thread.daemon = True
+        self._thread.start()
+
+    def stop(self):
+        """ Stops polling and waits for the thread to finish """
+        self._stop_event.set()
+        if self._thread is not None:
+            self._thread.join()
+            self._thread = None
+
+    def _get_signatures(self):
+        """
+        :rtype: tuple
+        :return: Tuple of (mtime, size) for each source file, or None for
+                 missing files
+        """
+        signatures = []
+        for path in self._resolver.sources:
+            try:
+                stat = os.stat(path)
+                signatures.append((stat.st_mtime_ns, stat.st_size))
+            except OSError:
+                signatures.append(None)
+        return tuple(signatures)
+
+    def _run(self):
+        while not self._stop_event.wait(self._interval):
+            self.check()
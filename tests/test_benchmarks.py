@@ -0,0 +1,47 @@
+import os
+import sys
+
+# The benchmarks live next to the tests rather than in the sherpa package
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from benchmarks import generate, suite  # noqa: E402
+from sherpa.resolver import PathResolver  # noqa: E402
+
+
+def test_generate(tmp_path):
+    resolver = PathResolver(generate.make_config(root=str(tmp_path), num_templates=3,
+                                                 depth=2, num_choices=4))
+    assert len(resolver.graph) == 6
+    for path in generate.make_paths(resolver, 20):
+        assert resolver.template_from_path(path).name.startswith('asset')
+
+    created = generate.make_tree(resolver, 10)
+    found = sorted(path for name in ('asset0', 'asset1', 'asset2')
+                   for path in resolver.get_template(name).paths({}))
+    assert [os.path.normpath(p) for p in created] == found
+
+
+def test_run(tmp_path):
+    params = {'num_templates': 2, 'num_paths': 10, 'num_files': 5}
+    report = suite.run('quick', repeat=1, params=params, min_time=0)
+    assert sorted(report['results']) == [
+        'extract_closest_template', 'format', 'parse_path', 'paths', 'values_from_paths'
+    ]
+    assert report['params']['num_paths'] == 10
+    assert suite.compare(report, report) == []
+    assert 'parse_path' in suite.format_report(report, report)
+
+    baseline_path = str(tmp_path.joinpath('baseline.json'))
+    assert suite.load_baseline(baseline_path, 'quick') is None
+    suite.save_baseline(baseline_path, report)
+    assert suite.load_baseline(baseline_path, 'quick') == report
+
+
+def test_compare():
+    baseline = {'results': {'parse_path': {'items_per_second': 100.0, 'peak_kb': 10.0}}}
+    report = {'results': {'parse_path': {'items_per_second': 70.0, 'peak_kb': 20.0},
+                          'new': {'items_per_second': 1.0, 'peak_kb': 1.0}}}
+    regressions = suite.compare(report, baseline, tolerance=0.25)
+    assert len(regressions) == 2
+    assert regressions[0].startswith('parse_path items_per_second')
+    assert suite.compare(report, baseline, tolerance=1.5) == []
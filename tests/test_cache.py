@@ -0,0 +1,79 @@
+import os
+import pickle
+import time
+
+import pytest
+
+from sherpa.cache import CacheStats, ListingCache
+from sherpa.resolver import PathResolver
+
+
+@pytest.fixture
+def root(tmp_path):
+    for name in ('a', 'b', 'c'):
+        tmp_path.joinpath(name, 'v001').mkdir(parents=True)
+    return str(tmp_path)
+
+
+def test_listdir(root):
+    cache = ListingCache()
+    assert cache.listdir(root) == (('a', True), ('b', True), ('c', True))
+    assert cache.listdir(root) == (('a', True), ('b', True), ('c', True))
+    assert cache.stats == CacheStats(hits=1, misses=1, evictions=0, size=1)
+
+
+def test_mtime_invalidation(root):
+    cache = ListingCache()
+    cache.listdir(root)
+    os.mkdir(os.path.join(root, 'd'))
+    # Ensure the mtime differs on filesystems with a coarse resolution
+    mtime = os.stat(root).st_mtime_ns + 1000000
+    os.utime(root, ns=(mtime, mtime))
+    assert [name for name, _ in cache.listdir(root)] == ['a', 'b', 'c', 'd']
+    assert cache.stats.misses == 2
+
+
+def test_ttl(root):
+    cache = ListingCache(ttl=0.01)
+    cache.listdir(root)
+    time.sleep(0.02)
+    cache.listdir(root)
+    assert cache.stats.hits == 0
+
+
+def test_eviction(root):
+    cache = ListingCache(max_entries=2)
+    for name in ('a', 'b', 'a', 'c'):
+        cache.listdir(os.path.join(root, name))
+    # b was the least recently used
+    assert cache.stats == CacheStats(hits=1, misses=3, evictions=1, size=2)
+    cache.listdir(os.path.join(root, 'a'))
+    assert cache.stats.hits == 2
+
+
+def test_missing_directory(root):
+    cache = ListingCache()
+    assert cache.listdir(os.path.join(root, 'missing')) == ()
+    assert cache.stats.size == 0
+
+
+def test_pickle(root):
+    cache = ListingCache(ttl=5, max_entries=10)
+    cache.listdir(root)
+    loaded = pickle.loads(pickle.dumps(cache))
+    assert (loaded.ttl, loaded.max_entries, loaded.stats.size) == (5, 10, 0)
+
+
+def test_resolver_shared(root):
+    cache = ListingCache()
+    pr = PathResolver({
+        'tokens': {'entity': 'str', 'version': {'type': 'int', 'padding': 3}},
+        'templates': {
+            'entity': root.replace(os.path.sep, '/') + '/{entity}',
+            'version': '{@entity}/v{version}',
+        },
+    }, listing_cache=cache)
+    assert pr.listing_cache is cache
+    assert len(pr.get_template('entity').paths({})) == 3
+    assert len(pr.get_template('version').paths({})) == 3
+    assert cache.stats.hits == 1
@@ -0,0 +1,61 @@
+import math
+
+from sherpa.resolver import PathResolver
+
+
+CONFIG = {
+    'tokens': {
+        'project': 'str',
+        'task': 'str',
+        'version': {'type': 'int', 'padding': 3},
+        'scale': 'float',
+        'frame': {'type': 'sequence', 'padding': 4},
+    },
+    'templates': {
+        'version': '/projects/{project}/{task}/v{version}',
+        'scale': '/projects/{project}/scale{scale}',
+        'frame': '/projects/{project}/{task}/v{version}/{project}.{frame}.exr',
+    }
+}
+
+
+def test_template_parse_columns():
+    template = PathResolver(CONFIG).get_template('frame')
+    parsed = template.parse_columns([
+        '/projects/a/comp/v001/a.1001.exr',
+        '/projects/b/comp/v002/b.0001.exr',
+        '/projects/a/other',
+        '/projects/a/anim/v001/a.1002.exr',
+    ])
+    assert list(parsed.columns) == ['project', 'task', 'version', 'frame']
+    assert list(parsed.mask) == [1, 1, 0, 1]
+    assert list(parsed.template_ids) == [0, 0, -1, 0]
+    assert parsed.templates == (template, )
+
+    project = parsed.columns['project']
+    assert list(project.codes) == [0, 1, -1, 0]
+    assert project.categories == ['a', 'b']
+    assert list(parsed.columns['version']) == [1, 2, 0, 1]
+    assert list(parsed.columns['frame']) == [1001, 1, 0, 1002]
+
+
+def test_resolver_parse_columns():
+    parsed = PathResolver(CONFIG).parse_columns([
+        '/projects/a/scale1.5',
+        '/projects/a/comp/v003',
+        '/missing',
+    ])
+    assert [t.name for t in parsed.templates] == ['version', 'scale', 'frame']
+    assert list(parsed.template_ids) == [1, 0, -1]
+    assert list(parsed.columns) == ['project', 'task', 'version', 'scale']
+    assert parsed.columns['task'].categories == ['comp']
+    assert list(parsed.columns['task'].codes) == [-1, 0, -1]
+    scale = list(parsed.columns['scale'])
+    assert scale[0] == 1.5
+    assert math.isnan(scale[1]) and math.isnan(scale[2])
+
+
+def test_parse_columns_empty():
+    parsed = PathResolver(CONFIG).parse_columns([])
+    assert len(parsed.mask) == 0
+    assert not parsed.columns
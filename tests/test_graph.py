@@ -0,0 +1,47 @@
+import pytest
+
+from sherpa.exceptions import PathResolverError
+from sherpa.graph import TemplateGraph
+
+
+TEMPLATES = {
+    'version': '{@task}/v{version}',
+    'root': '/projects',
+    'project': '{@root}/{project}',
+    'task': '{@project}/{task}',
+    'file': '{@version}/{@filename}',
+    'filename': '{name}.{ext}',
+}
+
+
+def test_order():
+    graph = TemplateGraph(TEMPLATES)
+    assert graph.order == ('root', 'project', 'task', 'version', 'filename', 'file')
+    assert list(graph) == list(graph.order)
+    assert graph.index('task') == 2
+
+
+def test_lookups():
+    graph = TemplateGraph(TEMPLATES)
+    assert graph.children('project') == {'task'}
+    assert graph.children('filename') == {'file'}
+    assert graph.descendants('project') == {'task', 'version', 'file'}
+    assert graph.descendants('file') == frozenset()
+    assert graph.references('file') == {'version', 'filename'}
+    assert graph.tokens('filename') == {'name', 'ext'}
+
+
+@pytest.mark.parametrize('templates, cycle', (
+    ({'a': '{@a}/a'}, 'a -> a'),
+    ({'a': '{@c}/a', 'b': '{@a}/b', 'c': '{@b}/c', 'd': '{@a}/d'}, 'a -> c -> b -> a'),
+))
+def test_cycle(templates, cycle):
+    with pytest.raises(PathResolverError) as exc:
+        TemplateGraph(templates)
+    assert cycle in str(exc.value)
+
+
+def test_missing_reference():
+    graph = TemplateGraph({'a': '{@missing}/a'})
+    assert graph.references('a') == frozenset()
+    assert graph.order == ('a', )
@@ -0,0 +1,33 @@
+from sherpa.interning import InternPool
+from sherpa.token import IntToken, StringToken
+from sherpa.template import Template
+
+
+def test_intern():
+    pool = InternPool(int_limit=1000)
+    first = ''.join(['pro', 'ject'])
+    second = ''.join(['proj', 'ect'])
+    assert first is not second
+    assert pool.intern(first) is first
+    assert pool.intern(second) is first
+
+    large = 10 ** 6
+    assert pool.intern(int('999')) is pool.intern(int('999'))
+    assert pool.intern(large) is large
+    assert pool.intern(1.5) == 1.5
+    assert len(pool) == 2
+    assert '999' not in pool and 999 in pool
+    pool.clear()
+    assert len(pool) == 0
+
+
+def test_template_parse():
+    tokens = {'project': StringToken('project'), 'frame': IntToken('frame', padding=4)}
+    template = Template('frame', '/{project}/{project}.{frame}.exr', tokens=tokens)
+    pool = InternPool()
+    first = template.parse('/alpha/alpha.1001.exr', pool=pool)
+    second = template.parse('/alpha/alpha.1001.exr', pool=pool)
+    assert first == second == {'project': 'alpha', 'frame': 1001}
+    assert first['project'] is second['project']
+    assert first['frame'] is second['frame']
+    assert template.parse_record('/alpha/alpha.1002.exr', pool=pool).project is first['project']
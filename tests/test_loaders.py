@@ -0,0 +1,81 @@
+import json
+
+import pytest
+
+from sherpa import constants, loaders
+from sherpa.exceptions import PathResolverError
+from sherpa.resolver import PathResolver
+
+
+BASE = {
+    'tokens': {
+        'project': 'str',
+        'storage': {'type': 'str', 'choices': ['active', 'archive']},
+    },
+    'templates': {
+        'project': '/projects/{project}',
+        'storage': '{@project}/{storage}',
+    },
+}
+
+SHOW = {
+    'tokens': {
+        'storage': {'type': 'str', 'choices': ['active', 'archive', 'dev']},
+        'task': 'str',
+    },
+    'templates': {
+        'project': '/shows/{project}',
+        'task': '{@storage}/{task}',
+    },
+}
+
+
+@pytest.mark.parametrize('filename, loader', (
+    ('config.yml', loaders.load_yaml),
+    ('config.YAML', loaders.load_yaml),
+    ('config.json', loaders.load_json),
+    ('config.msgpack', loaders.load_msgpack),
+    ('config.cfg', loaders.load_yaml),
+))
+def test_get_loader(filename, loader):
+    assert loaders.get_loader(filename) is loader
+
+
+def test_load_json(tmp_path):
+    path = tmp_path.joinpath('config.json')
+    path.write_text(json.dumps(BASE))
+    assert PathResolver.from_file(str(path)).config == BASE
+
+
+def test_load_msgpack_missing(monkeypatch):
+    monkeypatch.setattr(loaders, 'msgpack', None)
+    with pytest.raises(PathResolverError):
+        loaders.load_msgpack(b'')
+
+
+def test_register_loader(tmp_path, monkeypatch):
+    monkeypatch.setattr(loaders, 'LOADERS', dict(loaders.LOADERS))
+    loaders.register_loader('.CUSTOM', lambda data: BASE)
+    assert '.custom' in loaders.LOADERS
+    path = tmp_path.joinpath('config.custom')
+    path.write_text('')
+    assert loaders.load(str(path)) == BASE
+
+
+def test_merge():
+    merged = loaders.merge([BASE, SHOW])
+    assert list(merged[constants.TEMPLATE_KEY]) == ['project', 'storage', 'task']
+    assert merged[constants.TEMPLATE_KEY]['project'] == '/shows/{project}'
+    assert merged[constants.TOKEN_KEY]['storage']['choices'] == ['active', 'archive', 'dev']
+    assert BASE['templates']['project'] == '/projects/{project}'
+
+
+def test_from_files(tmp_path):
+    paths = []
+    for name, config in (('base.json', BASE), ('show.json', SHOW)):
+        path = tmp_path.joinpath(name)
+        path.write_text(json.dumps(config))
+        paths.append(str(path))
+    pr = PathResolver.from_files(paths)
+    assert pr.fields_from_path('/shows/a/dev/b') == {'project': 'a', 'storage': 'dev', 'task': 'b'}
+    assert pr.config == PathResolver.from_dict(BASE, SHOW).config
@@ -1,9 +1,12 @@
 import os
+import pickle
+import threading
 import shutil
 
 import pytest
 
-from sherpa import constants
+from sherpa import constants, resolver, snapshot, watcher
+from sherpa.exceptions import ParseError, PathResolverError
 from sherpa.resolver import PathResolver
 
 
@@ -316,3 +319,464 @@ def test_extract_closest_template(path, directory, template, start, end):
     assert results[0] == template
     assert results[1] == start
     assert results[3] == end
+
+
+def test_extract_closest_template_ranked():
+    pr = PathResolver({
+        'tokens': {'project': 'str', 'task': 'str'},
+        'templates': {
+            'root': '/projects',
+            'project': '{@root}/{project}',
+            'task': '{@project}/{task}',
+            'publishes': '{@project}/publishes',
+        }
+    })
+    # Equal depth ties are broken by priority instead of declaration order
+    template, start, fields, end = pr.extract_closest_template('/projects/a/publishes/file')
+    assert template.name == 'publishes'
+    assert end == 'file'
+
+    ranked = pr.extract_closest_template('/projects/a/publishes/file', ranked=True)
+    assert [match[0].name for match in ranked] == ['publishes', 'task', 'project', 'root']
+    assert ranked[1][2] == {'project': 'a', 'task': 'publishes'}
+    with pytest.raises(ParseError):
+        pr.extract_closest_template('/other/path')
+
+
+@pytest.mark.parametrize('path, template', (
+    ('/projects/alpha/publishes', 'publishes'),     # Literal beats token
+    ('/projects/alpha/work', 'task'),               # Only the token matches
+    ('/projects/alpha/v001', 'version'),            # Literal prefix beats token
+    ('/projects/alpha/other/file', 'file'),         # Declaration order
+))
+def test_parse_path_priority(path, template):
+    pr = PathResolver({
+        'tokens': {
+            'project': 'str',
+            'task': 'str',
+            'version': {'type': 'int', 'padding': 3},
+            'name': 'str',
+            'other': 'str',
+        },
+        'templates': {
+            'project': '/projects/{project}',
+            'task': '{@project}/{task}',
+            'publishes': '{@project}/publishes',
+            'version': '{@project}/v{version}',
+            'file': '{@project}/{task}/{name}',
+            'file_other': '{@project}/{other}/{name}',
+        }
+    })
+    assert pr.template_from_path(path).name == template
+
+
+@pytest.mark.parametrize('on_error, expected', (
+    ('skip', [('/projects/a', 'project'), ('/projects/a/b', 'task')]),
+    ('collect', [('/projects/a', 'project'), ('/other', None), ('/projects/a/b', 'task')]),
+))
+def test_parse_paths(on_error, expected):
+    pr = PathResolver({
+        'tokens': {'project': 'str', 'task': 'str'},
+        'templates': {'project': '/projects/{project}', 'task': '{@project}/{task}'},
+    })
+    paths = iter(['/projects/a', '/other', '/projects/a/b'])
+    results = pr.parse_paths(paths, chunk_size=2, on_error=on_error)
+    assert [(p, t.name if t else t) for p, t, _ in results] == expected
+
+
+def test_parse_paths_raise():
+    pr = PathResolver({'tokens': {'project': 'str'}, 'templates': {'project': '/projects/{project}'}})
+    results = pr.parse_paths(['/projects/a', '/other'], on_error='raise')
+    assert next(results)[0] == '/projects/a'
+    with pytest.raises(ParseError):
+        next(results)
+    with pytest.raises(ValueError):
+        pr.parse_paths([], on_error='ignore')
+
+
+@pytest.mark.parametrize('ordered', (True, False))
+def test_parse_paths_parallel(ordered):
+    pr = PathResolver({
+        'tokens': {'project': 'str', 'task': 'str'},
+        'templates': {'project': '/projects/{project}', 'task': '{@project}/{task}'},
+    })
+    paths = ['/projects/p{}/t{}'.format(i, i) for i in range(50)] + ['/other']
+    results = list(pr.parse_paths_parallel(paths, workers=2, chunk_size=7,
+                                           on_error='collect', ordered=ordered))
+    expected = list(pr.parse_paths(paths, on_error='collect'))
+    if not ordered:
+        results.sort(key=lambda r: r[0])
+        expected.sort(key=lambda r: r[0])
+    assert results == expected
+
+
+def test_parse_paths_parallel_pool():
+    from sherpa.interning import InternPool
+    pr = PathResolver(RELOAD_CONFIG)
+    paths = ['/projects/a/b/v{:03d}'.format(i) for i in range(6)]
+    # An empty pool must be used rather than treated as no pool
+    pool = InternPool()
+    results = [fields for _, _, fields in pr.parse_paths_parallel(paths, workers=2, chunk_size=2,
+                                                                  pool=pool)]
+    assert len(results) == 6
+    assert results[0]['project'] is results[5]['project']
+    assert results[0]['task'] is results[5]['task']
+    assert 'a' in pool
+
+
+def test_pickle():
+    config = {
+        'tokens': {'project': 'str', 'version': {'type': 'int', 'padding': 3}},
+        'templates': {'project': '/projects/{project}', 'version': '{@project}/v{version}'},
+    }
+    pr = PathResolver(config)
+    template, fields = pr.parse_path('/projects/a/v001')
+    assert template._compiled_regex is not None
+
+    loaded = pickle.loads(pickle.dumps(pr))
+    assert loaded.config == config
+    assert loaded.fields_from_path('/projects/a/v001') == fields
+
+    loaded_template = pickle.loads(pickle.dumps(template))
+    assert loaded_template._compiled_regex is None
+    assert loaded_template.parse('/projects/a/v001') == fields
+
+
+def test_values_from_paths_fields_unchanged(mock_filesystem):
+    template = mock_filesystem.pathresolver.get_template('publish')
+    fields = {'storage': 'active', 'category': 'categoryA', 'entity': 'entityA', 'publish_type': 'eggs'}
+    expected = fields.copy()
+    template.values_from_paths('version', fields)
+    assert fields == expected
+
+
+def test_values_from_paths_multi(mock_filesystem):
+    template = mock_filesystem.pathresolver.get_template('publish')
+    fields = {'storage': 'active', 'category': 'categoryA'}
+    values = template.values_from_paths_multi(('entity', 'publish_type', 'version'), fields)
+    assert sorted(values) == [
+        ('entityA', 'eggs', 1),
+        ('entityA', 'eggs', 2),
+        ('entityA', 'spam', 1),
+        ('entityB', 'spam', 1),
+    ]
+    path = values[('entityA', 'eggs', 2)]
+    assert mock_filesystem.filepaths[path]['fields']['version'] == 2
+
+
+def test_latest(mock_filesystem):
+    template = mock_filesystem.pathresolver.get_template('publish')
+    fields = {'storage': 'active', 'category': 'categoryA', 'entity': 'entityA', 'publish_type': 'eggs'}
+    value, path = template.latest('version', fields)
+    assert value == 2
+    assert mock_filesystem.filepaths[path]['fields']['version'] == 2
+    assert template.latest('version', dict(fields, entity='missing')) is None
+
+
+@pytest.mark.parametrize('field, fields, reverse, limit, values', (
+    ('version', {'storage': 'active', 'category': 'categoryA', 'entity': 'entityA', 'publish_type': 'eggs'}, True, None, [2, 1]),
+    ('version', {'storage': 'active', 'category': 'categoryA', 'entity': 'entityA', 'publish_type': 'eggs'}, False, 1, [1]),
+    ('entity', {'storage': 'active'}, True, 2, ['entityC', 'entityB']),
+    ('entity', {'storage': 'active'}, False, 2, ['entityA', 'entityB']),
+))
+def test_sorted_values(mock_filesystem, field, fields, reverse, limit, values):
+    template = mock_filesystem.pathresolver.get_template('publish')
+    results = template.sorted_values(field, fields, reverse=reverse, limit=limit)
+    assert [value for value, _ in results] == values
+
+
+def test_from_file_snapshot(mock_config, tmp_path):
+    config_path = tmp_path.joinpath('templates.yml')
+    config_path.write_text(open(mock_config).read())
+    config_path = str(config_path)
+
+    # Missing snapshot is built
+    pr = PathResolver.from_file(config_path, use_snapshot=True)
+    snapshot_path = snapshot.snapshot_path(config_path)
+    assert os.path.exists(snapshot_path)
+
+    # Valid snapshot is loaded with the templates already resolved
+    loaded = PathResolver.from_file(config_path, use_snapshot=True)
+    assert loaded.config == pr.config
+    template = loaded.get_template('publish')
+    assert template._pattern == pr.get_template('publish').pattern
+    path = '/projects/active/a/b/c/d/publishes/e/v001/c_e_v001.txt'
+    assert loaded.parse_path(path)[1] == pr.parse_path(path)[1]
+
+    # Stale snapshot is rebuilt
+    with open(config_path, 'a') as f:
+        f.write("  extra: '{@root}/extra'\n")
+    rebuilt = PathResolver.from_file(config_path, use_snapshot=True)
+    assert 'extra' in rebuilt.templates
+    assert 'extra' in PathResolver.from_file(config_path, use_snapshot=True).templates
+
+
+def test_from_file_snapshot_dir(mock_config, tmp_path):
+    PathResolver.from_file(mock_config, use_snapshot=True, snapshot_dir=str(tmp_path))
+    assert os.path.exists(snapshot.snapshot_path(mock_config, str(tmp_path)))
+
+
+def test_lazy():
+    pr = PathResolver({
+        'tokens': {
+            'project': 'str',
+            'task': 'str',
+            'broken': {'type': 'unknown'},
+        },
+        'templates': {
+            'project': '/projects/{project}',
+            'task': '{@project}/{task}',
+            'other': '/other/{project}',
+        }
+    }, lazy=True)
+    assert pr._state.templates == {} and pr._state.tokens == {}
+
+    # Only the template and its references are loaded
+    assert pr.get_template('task').format({'project': 'a', 'task': 'b'}) == '/projects/a/b'
+    assert sorted(pr._state.templates) == ['project', 'task']
+    assert sorted(pr._state.tokens) == ['project', 'task']
+
+    # Parsing materialises the remaining templates
+    assert pr.template_from_path('/other/a').name == 'other'
+    assert sorted(pr.templates) == ['other', 'project', 'task']
+
+    # Invalid tokens are only found when used or validated
+    with pytest.raises(ParseError):
+        pr.validate_all()
+    with pytest.raises(ParseError):
+        PathResolver(pr.config)
+
+
+RELOAD_CONFIG = {
+    'tokens': {
+        'project': 'str',
+        'task': 'str',
+        'version': {'type': 'int', 'padding': 3},
+    },
+    'templates': {
+        'project': '/projects/{project}',
+        'task': '{@project}/{task}',
+        'version': '{@task}/v{version}',
+        'other': '/other/{task}',
+        'unrelated': '/unrelated/{project}',
+    }
+}
+
+
+def test_reload():
+    pr = PathResolver(RELOAD_CONFIG)
+    templates = pr.templates
+    templates['unrelated'].compiled_regex
+
+    config = pr.config
+    config['tokens']['task'] = {'type': 'str', 'choices': ['a', 'b']}
+    config['templates']['version'] = '{@task}/version{version}'
+    rebuilt = pr.reload(config)
+    assert rebuilt == {'task', 'version', 'other'}
+
+    new_templates = pr.templates
+    assert new_templates['project'] is templates['project']
+    assert new_templates['unrelated'] is templates['unrelated']
+    assert new_templates['unrelated']._compiled_regex is not None
+    assert new_templates['task'] is not templates['task']
+    assert pr.get_token('task').choices == ['a', 'b']
+    assert pr.template_from_path('/projects/x/a/version001').name == 'version'
+    with pytest.raises(ParseError):
+        pr.parse_path('/projects/x/c')
+
+
+def test_reload_constructions(monkeypatch):
+    pr = PathResolver(RELOAD_CONFIG)
+    templates = []
+    resolvers = []
+
+    class CountingTemplate(resolver.Template):
+        def __init__(self, name, *args, **kwargs):
+            templates.append(name)
+            super(CountingTemplate, self).__init__(name, *args, **kwargs)
+
+    init = PathResolver.__init__
+
+    def counting_init(self, *args, **kwargs):
+        resolvers.append(self)
+        init(self, *args, **kwargs)
+
+    monkeypatch.setattr(resolver, 'Template', CountingTemplate)
+    monkeypatch.setattr(PathResolver, '__init__', counting_init)
+    config = pr.config
+    config['templates']['other'] = '/others/{task}'
+    assert pr.reload(config) == {'other'}
+    # Only the changed template is built, the resolver is never rebuilt
+    assert templates == ['other']
+    assert resolvers == []
+
+
+def test_reload_parent():
+    pr = PathResolver(RELOAD_CONFIG)
+    templates = pr.templates
+    config = pr.config
+    config['templates']['project'] = '/shows/{project}'
+    assert pr.reload(config) == {'project', 'task', 'version'}
+    assert pr.templates['other'] is templates['other']
+    assert pr.get_template('version').pattern == '/shows/{project}/{task}/v{version}'
+
+
+def test_reload_invalid():
+    pr = PathResolver(RELOAD_CONFIG)
+    templates = pr.templates
+    config = pr.config
+    config['templates']['task'] = '{@missing}/{task}'
+    with pytest.raises(KeyError):
+        pr.reload(config)
+    assert pr.templates == templates
+    assert pr.config == RELOAD_CONFIG
+    with pytest.raises(PathResolverError):
+        pr.reload()
+
+
+def test_watch(tmp_path):
+    import json
+    path = tmp_path.joinpath('config.json')
+    path.write_text(json.dumps(RELOAD_CONFIG))
+    pr = PathResolver.from_file(str(path))
+    assert pr.sources == (str(path), )
+
+    config_watcher = watcher.ConfigWatcher(pr)
+    assert not config_watcher.check()
+    config = pr.config
+    config['templates']['extra'] = '/extra/{project}'
+    path.write_text(json.dumps(config))
+    assert config_watcher.check()
+    assert 'extra' in pr.templates
+
+    # A running watcher is stopped cleanly
+    config_watcher = pr.watch(interval=0.01)
+    assert config_watcher.is_running
+    config_watcher.stop()
+    assert not config_watcher.is_running
+
+
+def test_freeze():
+    pr = PathResolver(RELOAD_CONFIG, lazy=True).freeze()
+    assert pr.frozen
+    assert sorted(pr._state.templates) == sorted(RELOAD_CONFIG['templates'])
+    assert all(t._compiled_regex is not None for t in pr._state.templates.values())
+    assert all(t._record is not None for t in pr._state.templates.values())
+    assert pickle.loads(pickle.dumps(pr)).frozen
+    with pytest.raises(PathResolverError):
+        pr.reload(RELOAD_CONFIG)
+    with pytest.raises(PathResolverError):
+        pr.watch()
+
+
+def test_freeze_many_choices():
+    choices = ['shot{:04d}'.format(i) for i in range(3000)]
+    cfg = {
+        constants.TOKEN_KEY: {'shot': {'type': 'str', 'choices': choices}, 'name': 'str'},
+        constants.TEMPLATE_KEY: dict(
+            [('t{}'.format(i), '/shots/{{shot}}/t{}/{{name}}'.format(i)) for i in range(50)]
+            + [('other', '/shots/{name}/t0/{name}')]
+        ),
+    }
+    pr = PathResolver(cfg).freeze()
+    # The choices are not expanded into every template's regex
+    assert all(len(t.regex) < 100 for t in pr._state.templates.values())
+    assert pr.parse_path('/shots/shot2999/t7/a') == (pr.get_template('t7'),
+                                                     {'shot': 'shot2999', 'name': 'a'})
+    # Values that aren't choices fall through to the next matching template
+    assert pr.parse_path('/shots/b/t0/b') == (pr.get_template('other'), {'name': 'b'})
+    with pytest.raises(ParseError):
+        pr.parse_path('/shots/b/t7/a')
+
+
+@pytest.mark.parametrize('lazy', (True, False))
+def test_freeze_threads(lazy):
+    pr = PathResolver(RELOAD_CONFIG, lazy=lazy).freeze()
+    cases = []
+    for i in range(50):
+        fields = {'project': 'p{}'.format(i), 'task': 't{}'.format(i % 7), 'version': i}
+        cases.append(('version', fields, '/projects/p{}/t{}/v{:03d}'.format(i, i % 7, i)))
+        cases.append(('other', {'task': fields['task']}, '/other/' + fields['task']))
+
+    errors = []
+    barrier = threading.Barrier(16)
+
+    def hammer():
+        barrier.wait()
+        try:
+            for _ in range(20):
+                for name, fields, path in cases:
+                    template = pr.get_template(name)
+                    assert template.format(fields) == path
+                    assert pr.parse_path(path) == (template, fields)
+                    record = template.parse_record(path)
+                    assert type(record) is template.record_type
+                    assert record._asdict() == fields
+        except Exception as e:
+            errors.append(e)
+
+    threads = [threading.Thread(target=hammer) for _ in range(16)]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+    assert errors == []
+
+
+def test_memoize():
+    pr = PathResolver(RELOAD_CONFIG, memoize=2)
+    assert pr.parse_cache_stats == (0, 0, 0, 0)
+    template, fields = pr.parse_path('/projects/a/b/v001')
+    assert pr.parse_path('/projects/a/b/v001')[1] is fields
+    assert pr.fields_from_path('/projects/a/b/v001') == {'project': 'a', 'task': 'b', 'version': 1}
+    assert pr.template_from_path('/projects/a/b/v001') is template
+    with pytest.raises(TypeError):
+        fields['project'] = 'b'
+    assert pr.parse_cache_stats == (3, 1, 0, 1)
+
+    pr.parse_path('/projects/a')
+    with pytest.raises(ParseError):
+        pr.parse_path('/missing')
+    assert pr.parse_cache_stats == (3, 3, 1, 2)
+
+    pr.reload(RELOAD_CONFIG)
+    assert pr.parse_cache_stats == (0, 0, 0, 0)
+    assert pickle.loads(pickle.dumps(pr)).memoize == 2
+    assert PathResolver(RELOAD_CONFIG).parse_cache_stats is None
+    with pytest.raises(ValueError):
+        PathResolver(RELOAD_CONFIG, memoize=0)
+
+
+@pytest.mark.parametrize('lazy', (True, False))
+def test_template_graph(lazy):
+    pr = PathResolver(RELOAD_CONFIG, lazy=lazy)
+    assert pr.graph.order == ('project', 'task', 'version', 'other', 'unrelated')
+    assert [t.name for t in pr.child_templates('project')] == ['task']
+    assert [t.name for t in pr.descendant_templates('project')] == ['task', 'version']
+    assert pr.descendant_templates('version') == []
+
+    config = pr.config
+    config['templates']['project'] = '{@version}/{project}'
+    with pytest.raises(PathResolverError):
+        pr.reload(config)
+    with pytest.raises(PathResolverError):
+        PathResolver(config)
+    with pytest.raises(PathResolverError):
+        PathResolver(config, lazy=True).get_template('task')
+
+
+def test_intern_values():
+    from sherpa.interning import InternPool
+    paths = ['/projects/a/b/v{:03d}'.format(i) for i in range(3)]
+    pr = PathResolver(RELOAD_CONFIG, intern_values=True)
+    first = pr.fields_from_path(paths[0])
+    assert pr.fields_from_path(paths[1])['task'] is first['task']
+    assert 'a' in pr.intern_pool
+
+    # Batch pools are independent of the resolver's pool
+    pool = InternPool()
+    results = [fields for _, _, fields in pr.parse_paths(paths, pool=pool)]
+    assert results[0]['project'] is results[2]['project']
+    assert len(pool) == 5
+    assert PathResolver(RELOAD_CONFIG).intern_pool is None
+    assert pickle.loads(pickle.dumps(pr)).intern_pool is not None
@@ -0,0 +1,130 @@
+import pytest
+
+from sherpa import sequence
+from sherpa.exceptions import ParseError
+from sherpa.template import Template
+from sherpa.token import SequenceToken, StringToken
+
+
+@pytest.mark.parametrize('spec, frames', (
+    ('1', [1]),
+    ('1-3', [1, 2, 3]),
+    ('1001-1009x2,1300', [1001, 1003, 1005, 1007, 1009, 1300]),
+    (' 5 , 1-2 ', [5, 1, 2]),
+))
+def test_iter_frames(spec, frames):
+    assert list(sequence.iter_frames(spec)) == frames
+
+
+@pytest.mark.parametrize('spec', ('', '1-', 'a', '5-1', '1-5x0', '-1'))
+def test_parse_frame_spec_fail(spec):
+    with pytest.raises(ParseError):
+        sequence.parse_frame_spec(spec)
+
+
+@pytest.mark.parametrize('frames, spec', (
+    ([], ''),
+    ([1], '1'),
+    ([1, 2], '1-2'),
+    ([1, 10], '1,10'),
+    ([1, 3, 5, 6, 7, 10], '1-5x2,6-7,10'),
+    ([3, 1, 2, 2], '1-3'),
+))
+def test_compact_frames(frames, spec):
+    assert sequence.compact_frames(frames) == spec
+
+
+def test_compact_large_range():
+    frames = list(range(1001, 201001, 2))
+    spec = sequence.compact_frames(frames)
+    assert spec == '1001-200999x2'
+    assert list(sequence.iter_frames(spec)) == frames
+
+
+@pytest.mark.parametrize('frames, ranges, spec', (
+    ([], [], ''),
+    ([5], [], ''),
+    ([1, 2, 5, 7], [(3, 4), (6, 6)], '3-4,6'),
+    ([7, 1, 1, 3], [(2, 2), (4, 6)], '2,4-6'),
+))
+def test_missing_ranges(frames, ranges, spec):
+    assert sequence.missing_ranges(frames) == ranges
+    assert sequence.missing_spec(frames) == spec
+
+
+def test_missing_outlier():
+    # The span is never expanded, an outlier frame costs nothing extra
+    frames = [1001, 1002, 20000000000]
+    assert sequence.missing_spec(frames) == '1003-19999999999'
+    assert sequence.compact_frames(frames) == '1001-1002,20000000000'
+
+
+@pytest.fixture
+def template():
+    tokens = {'shot': StringToken('shot'), 'frame': SequenceToken('frame', padding=4)}
+    return Template('render', '/renders/{shot}/{shot}.{frame}.exr', tokens=tokens)
+
+
+def test_format_range(template):
+    paths = list(template.format_range({'shot': 'sh010'}, 'frame', '1-5x2,1001'))
+    assert paths == [template.format({'shot': 'sh010', 'frame': f}) for f in (1, 3, 5, 1001)]
+
+
+def test_format_range_repeated_token():
+    tokens = {'frame': SequenceToken('frame', padding=3)}
+    template = Template('render', '/renders/{frame}/100%_{frame}.exr', tokens=tokens)
+    assert list(template.format_range({}, 'frame', '1-2')) == [
+        '/renders/001/100%_001.exr', '/renders/002/100%_002.exr'
+    ]
+
+
+def test_format_range_choices():
+    tokens = {'frame': SequenceToken('frame', choices=['1', '2'])}
+    template = Template('render', '/renders/{frame}.exr', tokens=tokens)
+    assert list(template.format_range({}, 'frame', '1-2')) == ['/renders/1.exr', '/renders/2.exr']
+
+
+def test_collapse_paths(template):
+    paths = list(template.format_range({'shot': 'sh010'}, 'frame', '1-3,5,7-8'))
+    paths += list(template.format_range({'shot': 'sh020'}, 'frame', '10-20x5'))
+    assert template.collapse_paths(paths, 'frame') == [
+        sequence.Sequence({'shot': 'sh010'}, '1-3,5,7-8', '4,6'),
+        sequence.Sequence({'shot': 'sh020'}, '10-20x5', '11-14,16-19'),
+    ]
+
+
+def test_sequences(tmp_path, template):
+    root = str(tmp_path).replace('\\', '/')
+    template = Template('render', root + template.pattern, tokens=template.tokens)
+    for shot, spec in (('sh010', '1-3,5'), ('sh020', '1001-1010x3')):
+        for path in template.format_range({'shot': shot}, 'frame', spec):
+            tmp_path.joinpath(path[len(root) + 1:]).parent.mkdir(parents=True, exist_ok=True)
+            open(path, 'w').close()
+
+    assert template.sequences({}, 'frame') == [
+        sequence.Sequence({'shot': 'sh010'}, '1-3,5', '4'),
+        sequence.Sequence({'shot': 'sh020'}, '1001-1010x3', '1002-1003,1005-1006,1008-1009'),
+    ]
+    assert template.sequences({'shot': 'sh020', 'frame': 1}, 'frame') == [
+        sequence.Sequence({'shot': 'sh020'}, '1001-1010x3', '1002-1003,1005-1006,1008-1009'),
+    ]
+
+
+def test_sequences_defaults(tmp_path):
+    root = str(tmp_path).replace('\\', '/')
+    tokens = {
+        'shot': StringToken('shot'),
+        'storage': StringToken('storage', default='active'),
+        'frame': SequenceToken('frame', padding=4),
+    }
+    template = Template('render', root + '/{storage}/{shot}.{frame}.exr', tokens=tokens)
+    tmp_path.joinpath('active').mkdir()
+    for path in template.format_range({'shot': 'a', 'storage': 'active'}, 'frame', '1-3'):
+        open(path, 'w').close()
+
+    assert template.sequences({}, 'frame', use_defaults=True) == [
+        sequence.Sequence({'shot': 'a', 'storage': 'active'}, '1-3', ''),
+    ]
+    assert template.sequences({'storage': 'active'}, 'frame') == [
+        sequence.Sequence({'shot': 'a', 'storage': 'active'}, '1-3', ''),
+    ]
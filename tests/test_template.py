@@ -119,3 +119,65 @@ def test_extract_specific():
     assert project.extract('/projects/path/to/something.ext') == ('/projects/path', {'project': 'path'}, 'to/something.ext')
     assert project.extract('/projects/path/to/something.ext', directory=False) == ('/projects/path', {'project': 'path'}, '/to/something.ext')
 
+
+def test_compiled_regex(mock_templates):
+    for mock_template in mock_templates:
+        template = mock_template.template
+        regex = template.compiled_regex
+        assert regex is template.compiled_regex
+        assert regex.pattern == '^' + template.regex + '$'
+        assert template.compiled_partial_regex.pattern == '^' + template.regex
+        assert template.compiled_directory_regex.pattern == '^' + template.regex + '(?:$|/)'
+
+
+def test_reset(mock_templates):
+    template = mock_templates[1].template
+    template.compiled_regex
+    template.reset()
+    assert template._compiled_regex is None
+    assert template.pattern == mock_templates[1].pattern
+    assert template.parse(mock_templates[1].path) == mock_templates[1].fields
+
+
+def test_format_many(mock_templates):
+    for mock_template in mock_templates:
+        template = mock_template.template
+        paths = template.format_many([mock_template.fields] * 3)
+        assert paths == [mock_template.path] * 3
+
+
+def test_format_literal_percent():
+    from sherpa.token import IntToken
+    token = IntToken('frame', padding=4)
+    template = Template('frames', '/renders/100%/{frame}.%d', tokens={'frame': token})
+    assert template.format({'frame': 1}) == '/renders/100%/0001.%d'
+
+
+def test_format_missing(mock_templates):
+    from sherpa.exceptions import FormatError
+    with pytest.raises(FormatError):
+        mock_templates[1].template.format({'one': 1})
+    with pytest.raises(FormatError):
+        mock_templates[1].template.format_many([{'one': 1, 'two': 2}, {'one': 1}])
+
+
+def test_parse_record(mock_templates):
+    for mock_template in mock_templates:
+        template = mock_template.template
+        record = template.parse_record(mock_template.path)
+        assert type(record) is template.record_type
+        assert record._asdict() == mock_template.fields
+        assert not hasattr(record, '__dict__')
+        assert not hasattr(template, '__dict__')
+
+
+def test_record_type_names():
+    from sherpa.token import IntToken, StringToken
+    tokens = {'_private': StringToken('_private'), 'frame': IntToken('frame')}
+    template = Template('2d-comp', '/{_private}/{frame}/{frame}', tokens=tokens)
+    record = template.parse_record('/a/1/1')
+    assert type(record).__name__ == '_2d_compRecord'
+    assert record == ('a', 1)
+    assert record.frame == 1
+    template.reset()
+    assert template.record_type is not type(record)
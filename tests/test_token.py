@@ -1,5 +1,6 @@
 import pytest
 
+from sherpa import constants
 from sherpa.token import Token, IntToken, StringToken, FloatToken
 from sherpa.exceptions import ParseError
 
@@ -80,3 +81,45 @@ def test_choices(cls, name, choices, values):
 ))
 def test_padding(cls, name, padding):
     assert cls(name, padding=padding).padding == padding
+
+
+@pytest.mark.parametrize('cls, padding, string', (
+    (FloatToken, None, '1.0'),
+    (IntToken, 3, '001'),
+    (StringToken, None, 'one'),
+))
+def test_compiled_regex(cls, padding, string):
+    token = cls('test', padding=padding)
+    assert token.compiled_regex is token.compiled_regex
+    assert token.compiled_regex.match(string)
+
+
+@pytest.mark.parametrize('cls, choices, padding, regex', (
+    (IntToken, ['001', '020'], 3, '(?:001|020)'),
+    (StringToken, ['a', 'b-c', 'ab'], None, r'(?:b\-c|ab|a)'),
+))
+def test_choices_regex(cls, choices, padding, regex):
+    token = cls('test', choices=choices, padding=padding)
+    assert token.regex == regex
+    assert token.compiled_regex.pattern == '^' + regex + '$'
+    assert cls('test', padding=padding).regex == token.value_regex
+
+
+def test_choices_regex_limit():
+    choices = ['c{}'.format(i) for i in range(constants.CHOICE_REGEX_LIMIT + 1)]
+    token = StringToken('test', choices=choices)
+    # Too many choices to enumerate in the regex, parse still checks them
+    assert token.regex == token.value_regex
+    assert token.choice_strings == frozenset(choices)
+    assert token.parse('c0') == 'c0'
+    with pytest.raises(ParseError):
+        token.parse('other')
+
+
+def test_slots():
+    import pickle
+    token = IntToken('test', choices=['1', '2'])
+    assert not hasattr(token, '__dict__')
+    loaded = pickle.loads(pickle.dumps(token))
+    assert loaded.choices == [1, 2]
+    assert loaded.parse('2') == 2
@@ -0,0 +1,138 @@
+import os
+import threading
+import time
+
+import pytest
+
+from sherpa import constants, walker
+from sherpa.token import IntToken, StringToken
+from sherpa.template import Template
+
+
+class CountingLister(walker.DirectoryLister):
+    def __init__(self):
+        self.listed = []
+
+    def listdir(self, path):
+        self.listed.append(path)
+        return super(CountingLister, self).listdir(path)
+
+
+@pytest.fixture
+def tree(tmp_path):
+    for relpath in (
+        'shows/alpha/assets/v001/alpha_v001.txt',
+        'shows/alpha/assets/v002/alpha_v002.txt',
+        'shows/alpha/assets/v002/alpha_v001.txt',
+        'shows/alpha/assets/v03/alpha_v03.txt',
+        'shows/alpha/assets/.hidden/alpha_v001.txt',
+        'shows/alpha/unused/v001/alpha_v001.txt',
+        'shows/beta/assets/v001/beta_v001.txt',
+        'shows/gamma/assets/v001/gamma_v001.txt',
+    ):
+        path = tmp_path.joinpath(relpath)
+        path.parent.mkdir(parents=True, exist_ok=True)
+        path.touch()
+    return str(tmp_path).replace(os.path.sep, '/')
+
+
+@pytest.fixture
+def template(tree):
+    tokens = {
+        'show': StringToken('show', choices=['alpha', 'beta']),
+        'version': IntToken('version', padding=3),
+    }
+    return Template('publish', tree + '/shows/{show}/assets/v{version}/{show}_v{version}.txt',
+                    tokens=tokens)
+
+
+def _relative(paths, root):
+    return [os.path.relpath(p, root).replace(os.path.sep, '/') for p in paths]
+
+
+def test_walk(tree, template):
+    paths = template.paths({})
+    assert _relative(paths, tree) == [
+        'shows/alpha/assets/v001/alpha_v001.txt',
+        'shows/alpha/assets/v002/alpha_v002.txt',
+        'shows/beta/assets/v001/beta_v001.txt',
+    ]
+
+
+def test_walk_literal_segments(tree, template):
+    lister = CountingLister()
+    segments = walker.compile_segments(template.pattern, template.tokens, {'version': '001'})
+    paths = [p for p, _ in walker.walk(segments, lister)]
+    assert _relative(paths, tree) == [
+        'shows/alpha/assets/v001/alpha_v001.txt',
+        'shows/beta/assets/v001/beta_v001.txt',
+    ]
+    # The show's choices are checked directly instead of listing the directory
+    assert lister.listed == []
+    assert segments[-4].names == ('alpha', 'beta')
+
+    # Too many choices lists the directory with the missing show instead
+    lister = CountingLister()
+    tokens = dict(template.tokens, show=StringToken('show', choices=['s{}'.format(i) for i in range(
+        constants.CHOICE_PROBE_LIMIT)] + ['alpha']))
+    segments = walker.compile_segments(template.pattern, tokens, {'version': '001'})
+    paths = [p for p, _ in walker.walk(segments, lister)]
+    assert _relative(paths, tree) == ['shows/alpha/assets/v001/alpha_v001.txt']
+    assert lister.listed == [tree + '/shows']
+
+
+def test_walk_captured(tree, template):
+    segments = walker.compile_segments(template.pattern, template.tokens, {'show': 'alpha'})
+    captured = [c for _, c in walker.walk(segments)]
+    assert captured == [{'version': '001'}, {'version': '002'}]
+
+
+def test_compile_segments(template):
+    segments = walker.compile_segments('/shows/{show}/v{version}', template.tokens, {'show': 'alpha'})
+    assert [s.literal for s in segments] == ['', 'shows', 'alpha', None]
+    assert segments[-1].fields == ('version', )
+    assert segments[-1].match('v010', {}) == {'version': '010'}
+    assert segments[-1].match('v10', {}) is None
+
+
+class LatencyLister(walker.DirectoryLister):
+    """ Simulates network storage by adding latency to each listing """
+    def __init__(self, latency=0.02):
+        self.latency = latency
+        self.active = 0
+        self.max_active = 0
+        self.lock = threading.Lock()
+
+    def listdir(self, path):
+        with self.lock:
+            self.active += 1
+            self.max_active = max(self.max_active, self.active)
+        time.sleep(self.latency)
+        with self.lock:
+            self.active -= 1
+        return super(LatencyLister, self).listdir(path)
+
+
+def test_walk_concurrent(tree, template):
+    lister = LatencyLister()
+    concurrent = Template(template.name, template.pattern, tokens=template.tokens, lister=lister)
+    paths = concurrent.paths({}, concurrency=4)
+    assert paths == template.paths({})
+    assert lister.max_active > 1
+
+
+def test_walk_concurrent_stream(tree, template):
+    lister = LatencyLister()
+    concurrent = Template(template.name, template.pattern, tokens=template.tokens, lister=lister)
+    iterator = concurrent.iter_paths({}, concurrency=2)
+    assert next(iterator) in template.paths({})
+    iterator.close()
+
+
+def test_latest_stops_early(tree, template):
+    lister = CountingLister()
+    ordered = Template(template.name, template.pattern, tokens=template.tokens, lister=lister)
+    value, path = ordered.latest('version', {'show': 'alpha'})
+    assert value == 2
+    assert _relative([path], tree) == ['shows/alpha/assets/v002/alpha_v002.txt']
+    assert lister.listed == [tree + '/shows/alpha/assets']